@@ -1,22 +1,84 @@
 import json
 import boto3
+from botocore.config import Config
 import os
+import time
 import uuid
-from datetime import datetime
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
 from decimal import Decimal
+from botocore.exceptions import ClientError
 
-# Initialize AWS clients
-dynamodb = boto3.resource('dynamodb')
+# Initialize AWS clients once per container so warm invocations reuse
+# pooled keep-alive connections; adaptive retries absorb throttling
+_boto_config = Config(
+    max_pool_connections=50,
+    retries={'mode': 'adaptive', 'total_max_attempts': 10},
+    tcp_keepalive=True
+)
+# Low-level client: writes are sent as prebuilt AttributeValue payloads,
+# skipping the resource layer's per-attribute type serialization
+ddb = boto3.client('dynamodb', config=_boto_config)
 
-# Get DynamoDB table
+# Get DynamoDB table and output settings once per container
 table_name = os.environ.get('DYNAMODB_TABLE_NAME')
-table = dynamodb.Table(table_name) if table_name else None
+CLOUDFRONT_DOMAIN = os.environ.get('CLOUDFRONT_DOMAIN', '')
+
+# Open a pooled connection during init so the first invocation skips the TLS handshake
+try:
+    ddb.describe_endpoints()
+except Exception:
+    pass
+
+# Counter item holding the total number of videos, read by the video lister
+VIDEO_COUNTER_ID = '__video_count__'
+
+# BatchWriteItem accepts at most 25 puts per request
+BATCH_WRITE_MAX_ITEMS = 25
+BATCH_WRITE_MAX_ATTEMPTS = 5
+BATCH_WRITE_BASE_DELAY = 0.05
+BATCH_WRITE_MAX_DELAY = 1.0
+
+# Events of one SQS batch processed concurrently; the boto3 client is
+# thread-safe and its connection pool (max_pool_connections) covers this
+EVENT_WORKERS = 10
+
+# Attempts at the alternating "update URLs" / "create URL map" UpdateItem
+URL_MAP_UPDATE_ATTEMPTS = 4
+
+# MediaConvert video output suffixes mapped to their length, for stripping
+TIER_SUFFIXES = {
+    suffix: len(suffix)
+    for suffix in ('_free_480p.mp4', '_standard_480p.mp4', '_premium_720p.mp4', '_premium_1080p.mp4')
+}
+THUMBNAIL_MARKER = '_thumbnail.'
+
+# Full job renditions in encoding order: output suffix -> (videoUrls key, folder, quality)
+# The processor skips renditions larger than the source, so only the suffixes
+# found in a job's outputs are recorded
+FULL_RENDITIONS = {
+    '_standard_480p.mp4': ('standard', 'standard', '480p'),
+    '_premium_720p.mp4': ('premium_720p', 'premium', '720p'),
+    '_premium_1080p.mp4': ('premium_1080p', 'premium', '1080p')
+}
+
+# Everything handle_job_completion needs from a job's output details
+EventOutputs = namedtuple('EventOutputs', ['filename', 'job_type', 'thumbnail_filename', 'duration', 'suffixes'])
+
+# Constant partition key placing every video in the AllVideosByDateIndex GSI.
+# If write throughput ever outgrows a single partition, shard this into buckets.
+ALL_VIDEOS_PARTITION = 'V'
 
 def lambda_handler(event, context):
     """
     Lambda function to handle MediaConvert job completion events from EventBridge
+    Accepts a single EventBridge event or a batch of them delivered through SQS
     Creates video metadata when jobs complete successfully or handles failures
     """
+    if 'Records' in event:
+        return handle_event_batch(event['Records'])
+    
     try:
         print(f"Received EventBridge event: {json.dumps(event)}")
         
@@ -32,14 +94,9 @@ def lambda_handler(event, context):
                 'body': json.dumps({'error': 'Missing required fields'})
             }
         
-        print(f"Processing MediaConvert job completion: {job_id}, status: {status}")
-        
-        if status == 'COMPLETE':
-            handle_job_completion(job_id, detail)
-        elif status == 'ERROR':
-            handle_job_error(job_id, detail)
-        else:
-            print(f"Unhandled job status: {status}")
+        pending_records = {}
+        process_job_event(detail, pending_records)
+        write_video_records(list(pending_records.values()))
         
         return {
             'statusCode': 200,
@@ -57,100 +114,156 @@ def lambda_handler(event, context):
             })
         }
 
+def handle_event_batch(records):
+    """
+    Handle a batch of EventBridge events delivered through SQS
+    Events are processed concurrently so their DynamoDB round trips overlap;
+    staged video records are then flushed together with BatchWriteItem and
+    messages that fail are reported back so only they are redriven
+    """
+    print(f"Received batch of {len(records)} MediaConvert events")
+    
+    pending_records = {}
+    batch_item_failures = []
+    
+    with ThreadPoolExecutor(max_workers=EVENT_WORKERS) as executor:
+        futures = {
+            record['messageId']: executor.submit(process_batch_message, record, pending_records)
+            for record in records
+        }
+        for message_id, future in futures.items():
+            try:
+                future.result()
+            except Exception as e:
+                print(f"Error processing message {message_id}: {str(e)}")
+                batch_item_failures.append({'itemIdentifier': message_id})
+    
+    # A failed flush raises so the whole batch is retried
+    write_video_records(list(pending_records.values()))
+    
+    return {'batchItemFailures': batch_item_failures}
+
+def process_batch_message(record, pending_records):
+    """
+    Process one SQS message wrapping an EventBridge event
+    """
+    detail = json.loads(record['body']).get('detail', {})
+    if not detail.get('jobId') or not detail.get('status'):
+        print(f"Skipping message {record.get('messageId')} with missing jobId/status")
+        return
+    process_job_event(detail, pending_records)
+
+def process_job_event(detail, pending_records):
+    """
+    Apply a single MediaConvert job state change
+    Completed jobs are written immediately with an atomic UpdateItem; failed
+    jobs are staged in pending_records for a batched write
+    """
+    job_id = detail['jobId']
+    status = detail['status']
+    print(f"Processing MediaConvert job completion: {job_id}, status: {status}")
+    
+    if status == 'COMPLETE':
+        handle_job_completion(job_id, detail)
+    elif status == 'ERROR':
+        video_record = handle_job_error(job_id, detail)
+        pending_records[video_record['videoId']] = video_record
+    else:
+        print(f"Unhandled job status: {status}")
+
+def video_id_for_filename(filename):
+    """
+    Derive a stable video ID from the original filename so the free and full
+    jobs of one upload address the same item without looking it up first
+    """
+    return str(uuid.uuid5(uuid.NAMESPACE_URL, filename))
+
 def handle_job_completion(job_id, detail):
     """
     Handle successful MediaConvert job completion
-    Creates video record in DynamoDB with all metadata
+    Creates or updates the video record in DynamoDB with a single UpdateItem
+    Returns True when a new video record was created
     """
     try:
-        # Extract filename directly from EventBridge event
-        filename = extract_filename_from_event(detail)
+        # Extract filename, job type, thumbnail and duration directly from EventBridge event
+        outputs = parse_event_outputs(detail)
+        filename = outputs.filename
         if not filename:
             print(f"Could not extract filename from event for job ID: {job_id}")
-            return
+            return False
         
         print(f"Processing completed job {job_id} for file: {filename}")
         
+        # One timestamp for every date written by this invocation
+        now_iso = datetime.now(timezone.utc).isoformat(timespec='seconds')
+        
         # We don't need the original key/bucket since we have all output info
         original_key = f"{filename}.mp4"  # Reconstructed for reference
         input_bucket = "processed"  # Generic since we don't need it
         
-        # Check if a video record already exists for this filename
-        existing_video = find_existing_video_by_filename(filename)
-        
-        if existing_video:
-            video_id = existing_video['videoId']
-            print(f"Found existing video record: {video_id}")
-        else:
-            # Generate unique video ID for new video
-            video_id = str(uuid.uuid4())
-            print(f"Creating new video record: {video_id}")
-        
-        # Get output details from environment
-        output_bucket = os.environ.get('OUTPUT_BUCKET')
-        cloudfront_domain = os.environ.get('CLOUDFRONT_DOMAIN', '')
+        video_id = video_id_for_filename(filename)
         
         # Determine which URLs to update based on job output
-        job_type = get_job_type_from_detail(detail)
+        job_type = outputs.job_type
         
-        # Start with existing URLs if video exists
-        if existing_video:
-            video_urls = existing_video.get('videoUrls', {})
-        else:
-            video_urls = {}
-        
-        # Update URLs based on job type
         if job_type == 'free':
-            video_urls['free'] = f"https://{cloudfront_domain}/free/{filename}_free_480p.mp4"
+            video_urls = {
+                'free': f"https://{CLOUDFRONT_DOMAIN}/free/{filename}_free_480p.mp4"
+            }
         else:  # full job
-            video_urls.update({
-                'standard': f"https://{cloudfront_domain}/standard/{filename}_standard_480p.mp4", 
-                'premium_720p': f"https://{cloudfront_domain}/premium/{filename}_premium_720p.mp4",
-                'premium_1080p': f"https://{cloudfront_domain}/premium/{filename}_premium_1080p.mp4"
-            })
-        
-        # Extract actual thumbnail URL from job output if available
-        thumbnail_url = extract_thumbnail_url_from_event(detail, cloudfront_domain, filename)
-        
-        # Get video duration from MediaConvert job details if available
-        duration = extract_duration_from_job_detail(detail)
+            # Only the renditions the job produced; all of them if none were reported
+            suffixes = [suffix for suffix in FULL_RENDITIONS if suffix in outputs.suffixes] or list(FULL_RENDITIONS)
+            video_urls = {}
+            qualities = []
+            for suffix in suffixes:
+                url_key, folder, quality = FULL_RENDITIONS[suffix]
+                video_urls[url_key] = f"https://{CLOUDFRONT_DOMAIN}/{folder}/{filename}{suffix}"
+                qualities.append(quality)
+        
+        # Use the actual thumbnail from job output if available, otherwise
+        # fall back to the expected naming pattern
+        thumbnail_filename = outputs.thumbnail_filename or f"{filename}_thumbnail.0000000.jpg"
+        thumbnail_url = f"https://{CLOUDFRONT_DOMAIN}/thumbnails/{thumbnail_filename}"
+        
+        # Video duration from MediaConvert job details if available
+        duration = outputs.duration
+        
+        # Attributes overwritten by every completion
+        set_fields = {
+            'status': 'completed',
+            'completedDate': now_iso,
+            '_all': ALL_VIDEOS_PARTITION
+        }
+        # Attributes only written when the video record is first created
+        initial_fields = {
+            'originalFilename': filename,
+            'originalKey': original_key,
+            'inputBucket': input_bucket,
+            'uploadDate': now_iso,
+            'title': filename.replace('_', ' ').replace('-', ' ').title(),
+            'description': f"Video processed from {original_key}"
+        }
         
-        # Create or update video record
-        if existing_video:
-            # Update existing record
-            video_record = existing_video.copy()
-            video_record['videoUrls'] = video_urls
-            video_record['mediaConvertJobId'] = f"{existing_video.get('mediaConvertJobId', '')},{job_id}"
-            video_record['completedDate'] = datetime.utcnow().isoformat()
-            
-            # Update thumbnail URL if this is the full job
-            if job_type == 'full':
-                video_record['thumbnailUrl'] = thumbnail_url
+        # Only the full job produces the real thumbnail and knows the encoded qualities
+        if job_type == 'full':
+            set_fields['thumbnailUrl'] = thumbnail_url
+            set_fields['availableQualities'] = qualities
         else:
-            # Create new record
-            video_record = {
-                'videoId': video_id,
-                'originalFilename': filename,
-                'originalKey': original_key,
-                'inputBucket': input_bucket,
-                'mediaConvertJobId': job_id,
-                'status': 'completed',
-                'videoUrls': video_urls,
-                'thumbnailUrl': thumbnail_url,
-                'availableQualities': ['480p', '720p', '1080p'],
-                'uploadDate': datetime.utcnow().isoformat(),
-                'completedDate': datetime.utcnow().isoformat(),
-                'title': filename.replace('_', ' ').replace('-', ' ').title(),
-                'description': f"Video processed from {original_key}"
-            }
+            initial_fields['thumbnailUrl'] = thumbnail_url
+            initial_fields['availableQualities'] = ['480p', '720p', '1080p']
         
+        # The free job reports the length of its preview clip, so it must not
+        # overwrite the full duration whichever job completes last
         if duration:
-            video_record['duration'] = Decimal(str(duration))
+            if job_type == 'full':
+                set_fields['duration'] = Decimal(str(duration))
+            else:
+                initial_fields['duration'] = Decimal(str(duration))
         
-        # Create video record in DynamoDB
-        create_video_record(video_record)
+        is_new = update_completed_video_record(video_id, job_id, video_urls, set_fields, initial_fields)
         
-        print(f"Successfully created video record for completed job: {job_id}, video_id: {video_id}")
+        print(f"Successfully {'created' if is_new else 'updated'} video record for completed job: {job_id}, video_id: {video_id}")
+        return is_new
         
     except Exception as e:
         print(f"Error handling job completion: {str(e)}")
@@ -159,11 +272,11 @@ def handle_job_completion(job_id, detail):
 def handle_job_error(job_id, detail):
     """
     Handle failed MediaConvert job
-    Creates video record with error status
+    Builds a new video record with error status for a batched write
     """
     try:
         # Extract filename directly from EventBridge event (if available in error case)
-        filename = extract_filename_from_event(detail)
+        filename = parse_event_outputs(detail).filename
         if not filename:
             # For failed jobs, we might not have output details, so use job ID as fallback
             filename = f"failed_job_{job_id}"
@@ -171,12 +284,16 @@ def handle_job_error(job_id, detail):
         
         print(f"Processing failed job {job_id} for file: {filename}")
         
+        # One timestamp for every date written by this invocation
+        now_iso = datetime.now(timezone.utc).isoformat(timespec='seconds')
+        
         # Generic values for failed jobs
         original_key = f"{filename}.mp4"
         input_bucket = "failed"
         
-        # Generate unique video ID
-        video_id = str(uuid.uuid4())
+        # Derive the ID from the job so a redelivered ERROR event overwrites
+        # the same failed record instead of adding another one
+        video_id = str(uuid.uuid5(uuid.NAMESPACE_URL, f"failed:{job_id}"))
         
         # Extract error information from the event detail
         error_message = detail.get('errorMessage', 'Unknown error')
@@ -188,20 +305,18 @@ def handle_job_error(job_id, detail):
             'originalFilename': filename,
             'originalKey': original_key,
             'inputBucket': input_bucket,
-            'mediaConvertJobId': job_id,
+            'mediaConvertJobIds': {job_id},
             'status': 'failed',
-            'uploadDate': datetime.utcnow().isoformat(),
-            'errorDate': datetime.utcnow().isoformat(),
+            'uploadDate': now_iso,
+            'errorDate': now_iso,
             'errorMessage': error_message,
             'errorCode': error_code,
             'title': filename.replace('_', ' ').replace('-', ' ').title(),
             'description': f"Failed to process video from {original_key}"
         }
         
-        # Create video record in DynamoDB
-        create_video_record(video_record)
-        
-        print(f"Created video record for failed job: {job_id}, video_id: {video_id}, error: {error_message}")
+        print(f"Prepared video record for failed job: {job_id}, video_id: {video_id}, error: {error_message}")
+        return video_record
         
     except Exception as e:
         print(f"Error handling job error: {str(e)}")
@@ -209,158 +324,236 @@ def handle_job_error(job_id, detail):
 
 
 
-def find_existing_video_by_filename(filename):
+def update_completed_video_record(video_id, job_id, video_urls, set_fields, initial_fields):
     """
-    Find existing video record by original filename
+    Create or update a completed video record with one atomic UpdateItem
+    Only the job's own quality URLs are written, so concurrent free and full
+    job completions cannot clobber each other
+    Returns True when the record did not exist before
     """
-    try:
-        if not table:
-            print("DynamoDB table not configured")
-            return None
-        
-        # Scan for existing video with same filename
-        response = table.scan(
-            FilterExpression='originalFilename = :filename',
-            ExpressionAttributeValues={':filename': filename}
-        )
-        
-        items = response.get('Items', [])
-        if items:
-            print(f"Found {len(items)} existing videos for filename: {filename}")
-            return items[0]  # Return the first match
-        
-        return None
-        
-    except Exception as e:
-        print(f"Error finding existing video by filename: {str(e)}")
-        return None
+    if not table_name:
+        print("DynamoDB table not configured")
+        return False
+    
+    # Job IDs live in a string set, so adding one is a server-side, deduplicated ADD
+    names = {'#jobIds': 'mediaConvertJobIds', '#urls': 'videoUrls'}
+    values = {':jobId': {'SS': [job_id]}}
+    clauses = []
+    
+    for index, (attr, value) in enumerate(set_fields.items()):
+        names[f'#s{index}'] = attr
+        values[f':s{index}'] = to_av(value)
+        clauses.append(f'#s{index} = :s{index}')
+    
+    for index, (attr, value) in enumerate(initial_fields.items()):
+        names[f'#i{index}'] = attr
+        values[f':i{index}'] = to_av(value)
+        clauses.append(f'#i{index} = if_not_exists(#i{index}, :i{index})')
+    
+    # Nested map paths can only be set once the map exists, so try updating
+    # the individual URLs first and fall back to creating the whole map;
+    # a concurrent completion creating the map in between just means we
+    # alternate back to the first form
+    url_names = {f'#u{index}': quality for index, quality in enumerate(video_urls)}
+    url_values = {f':u{index}': {'S': url} for index, url in enumerate(video_urls.values())}
+    url_clauses = [f'#urls.#u{index} = :u{index}' for index in range(len(video_urls))]
+    
+    for attempt in range(URL_MAP_UPDATE_ATTEMPTS):
+        try:
+            if attempt % 2 == 0:
+                response = ddb.update_item(
+                    TableName=table_name,
+                    Key={'videoId': {'S': video_id}},
+                    UpdateExpression='SET ' + ', '.join(clauses + url_clauses) + ' ADD #jobIds :jobId',
+                    ConditionExpression='attribute_exists(#urls)',
+                    ExpressionAttributeNames={**names, **url_names},
+                    ExpressionAttributeValues={**values, **url_values},
+                    ReturnValues='UPDATED_OLD'
+                )
+            else:
+                response = ddb.update_item(
+                    TableName=table_name,
+                    Key={'videoId': {'S': video_id}},
+                    UpdateExpression='SET ' + ', '.join(clauses + ['#urls = :urls']) + ' ADD #jobIds :jobId',
+                    ConditionExpression='attribute_not_exists(#urls)',
+                    ExpressionAttributeNames=names,
+                    ExpressionAttributeValues={**values, ':urls': to_av(video_urls)},
+                    ReturnValues='UPDATED_OLD'
+                )
+        except ClientError as e:
+            if e.response['Error']['Code'] != 'ConditionalCheckFailedException':
+                raise
+            continue
+        
+        is_new = 'uploadDate' not in response.get('Attributes', {})
+        if is_new:
+            increment_video_count()
+        return is_new
+    
+    raise Exception(f"Could not update video URLs for {video_id} after {URL_MAP_UPDATE_ATTEMPTS} attempts")
 
-def create_video_record(video_record):
+def write_video_records(video_records):
     """
-    Create or update video record in DynamoDB
+    Create video records in DynamoDB with BatchWriteItem
+    Unprocessed items are retried with exponential backoff
     """
     try:
-        if not table:
+        if not table_name:
             print("DynamoDB table not configured")
             return
         
-        table.put_item(Item=video_record)
-        print(f"Created/updated video record: {video_record['videoId']}")
+        if not video_records:
+            return
+        
+        new_videos = 0
+        for start in range(0, len(video_records), BATCH_WRITE_MAX_ITEMS):
+            chunk = video_records[start:start + BATCH_WRITE_MAX_ITEMS]
+            # Redelivered events rewrite records that already exist; only
+            # records not stored yet change the total video count
+            new_videos += count_new_records(chunk)
+            for video_record in chunk:
+                video_record['_all'] = ALL_VIDEOS_PARTITION
+            
+            request_items = {
+                table_name: [{'PutRequest': {'Item': to_av(video_record)['M']}} for video_record in chunk]
+            }
+            for attempt in range(BATCH_WRITE_MAX_ATTEMPTS):
+                response = ddb.batch_write_item(RequestItems=request_items)
+                request_items = response.get('UnprocessedItems') or {}
+                if not request_items:
+                    break
+                time.sleep(min(BATCH_WRITE_BASE_DELAY * (2 ** attempt), BATCH_WRITE_MAX_DELAY))
+            else:
+                raise Exception(f"Unprocessed items remained after {BATCH_WRITE_MAX_ATTEMPTS} attempts")
+            
+            print(f"Created/updated video records: {[r['videoId'] for r in chunk]}")
+        
+        if new_videos:
+            increment_video_count(new_videos)
         
     except Exception as e:
-        print(f"Error creating video record: {str(e)}")
+        print(f"Error writing video records: {str(e)}")
         raise
 
-def extract_filename_from_event(detail):
+def count_new_records(video_records):
     """
-    Extract original filename from EventBridge event output file paths
+    Count the records whose videoId is not in the table yet, with one
+    keys-only BatchGetItem (at most 25 keys, within its 100-key limit)
+    Keys DynamoDB leaves unprocessed after retrying are counted as new
     """
-    try:
-        output_group_details = detail.get('outputGroupDetails', [])
-        
-        for group in output_group_details:
-            output_details = group.get('outputDetails', [])
-            for output in output_details:
-                output_file_paths = output.get('outputFilePaths', [])
-                for file_path in output_file_paths:
-                    # Extract filename from S3 path
-                    # Example: "s3://bucket/free/filename_free_480p.mp4"
-                    if file_path:
-                        # Get the filename part
-                        filename_with_suffix = file_path.split('/')[-1]
-                        
-                        # Remove the tier-specific suffix to get original filename
-                        # Example: "filename_free_480p.mp4" -> "filename"
-                        if '_free_480p.mp4' in filename_with_suffix:
-                            return filename_with_suffix.replace('_free_480p.mp4', '')
-                        elif '_standard_480p.mp4' in filename_with_suffix:
-                            return filename_with_suffix.replace('_standard_480p.mp4', '')
-                        elif '_premium_720p.mp4' in filename_with_suffix:
-                            return filename_with_suffix.replace('_premium_720p.mp4', '')
-                        elif '_premium_1080p.mp4' in filename_with_suffix:
-                            return filename_with_suffix.replace('_premium_1080p.mp4', '')
-                        elif '_thumbnail.' in filename_with_suffix:
-                            # Extract from thumbnail: "filename_thumbnail.0000000.jpg" -> "filename"
-                            return filename_with_suffix.split('_thumbnail.')[0]
-        
-        return None
-        
-    except Exception as e:
-        print(f"Error extracting filename from event: {str(e)}")
-        return None
+    request_items = {
+        table_name: {
+            'Keys': [{'videoId': {'S': record['videoId']}} for record in video_records],
+            'ProjectionExpression': 'videoId'
+        }
+    }
+    existing = 0
+    for attempt in range(BATCH_WRITE_MAX_ATTEMPTS):
+        response = ddb.batch_get_item(RequestItems=request_items)
+        existing += len(response.get('Responses', {}).get(table_name, []))
+        request_items = response.get('UnprocessedKeys') or {}
+        if not request_items:
+            break
+        time.sleep(min(BATCH_WRITE_BASE_DELAY * (2 ** attempt), BATCH_WRITE_MAX_DELAY))
+    return len(video_records) - existing
 
-def get_job_type_from_detail(detail):
+def increment_video_count(amount=1):
     """
-    Determine if this is a free job or full job based on output paths
+    Atomically bump the total video count so listing doesn't need a COUNT scan
     """
     try:
-        output_group_details = detail.get('outputGroupDetails', [])
-        
-        for group in output_group_details:
-            output_details = group.get('outputDetails', [])
-            for output in output_details:
-                output_file_paths = output.get('outputFilePaths', [])
-                for file_path in output_file_paths:
-                    if '/free/' in file_path:
-                        return 'free'
-                    elif '/standard/' in file_path or '/premium/' in file_path:
-                        return 'full'
-        
-        return 'unknown'
-        
+        ddb.update_item(
+            TableName=table_name,
+            Key={'videoId': {'S': VIDEO_COUNTER_ID}},
+            UpdateExpression='ADD #count :amount',
+            ExpressionAttributeNames={'#count': 'count'},
+            ExpressionAttributeValues={':amount': {'N': str(amount)}}
+        )
     except Exception as e:
-        print(f"Error determining job type: {str(e)}")
-        return 'unknown'
+        # The count is informational only; never fail the record write for it
+        print(f"Error incrementing video count: {str(e)}")
 
-def extract_thumbnail_url_from_event(detail, cloudfront_domain, filename):
+def to_av(value):
     """
-    Extract actual thumbnail URL from MediaConvert job output
+    Convert a Python value into a DynamoDB AttributeValue for the low-level client
     """
-    try:
-        output_group_details = detail.get('outputGroupDetails', [])
-        
-        for group in output_group_details:
-            output_details = group.get('outputDetails', [])
-            for output in output_details:
-                output_file_paths = output.get('outputFilePaths', [])
-                for file_path in output_file_paths:
-                    # Look for thumbnail files
-                    if '/thumbnails/' in file_path and '_thumbnail.' in file_path:
-                        # Convert S3 path to CloudFront URL
-                        # Example: "s3://bucket/thumbnails/filename_thumbnail.0000000.jpg"
-                        thumbnail_filename = file_path.split('/')[-1]
-                        return f"https://{cloudfront_domain}/thumbnails/{thumbnail_filename}"
-        
-        # Fallback to expected naming pattern if not found in output
-        return f"https://{cloudfront_domain}/thumbnails/{filename}_thumbnail.0000000.jpg"
-        
-    except Exception as e:
-        print(f"Error extracting thumbnail URL: {str(e)}")
-        # Fallback to expected naming pattern
-        return f"https://{cloudfront_domain}/thumbnails/{filename}_thumbnail.0000000.jpg"
+    if isinstance(value, str):
+        return {'S': value}
+    if isinstance(value, bool):
+        return {'BOOL': value}
+    if isinstance(value, (int, float, Decimal)):
+        return {'N': str(value)}
+    if isinstance(value, dict):
+        return {'M': {key: to_av(item) for key, item in value.items()}}
+    if isinstance(value, (list, tuple)):
+        return {'L': [to_av(item) for item in value]}
+    if isinstance(value, (set, frozenset)):
+        return {'SS': [str(item) for item in value]}
+    if value is None:
+        return {'NULL': True}
+    raise TypeError(f"Unsupported DynamoDB attribute type: {type(value).__name__}")
 
-def extract_duration_from_job_detail(detail):
+def parse_event_outputs(detail):
     """
-    Extract video duration from MediaConvert job detail if available
-    Returns duration in seconds as a float
+    Extract filename, job type, thumbnail file, duration and rendition suffixes from the
+    EventBridge event output details in a single pass over the output paths
     """
+    filename = None
+    job_type = None
+    thumbnail_filename = None
+    duration_ms = None
+    suffixes = set()
+    
     try:
-        # Try to get duration from output group details first
-        output_group_details = detail.get('outputGroupDetails', [])
-        for group in output_group_details:
-            output_details = group.get('outputDetails', [])
-            for output in output_details:
-                duration_ms = output.get('durationInMs')
-                if duration_ms:
-                    return float(duration_ms) / 1000.0  # Convert to seconds
-        
-        # Fallback to job details if available
-        job_details = detail.get('jobDetails', {})
-        if 'durationInMs' in job_details:
-            return float(job_details['durationInMs']) / 1000.0  # Convert to seconds
-        
-        return None
+        for group in detail.get('outputGroupDetails', ()):
+            for output in group.get('outputDetails', ()):
+                if not duration_ms:
+                    duration_ms = output.get('durationInMs')
+                
+                for file_path in output.get('outputFilePaths', ()):
+                    if not file_path:
+                        continue
+                    
+                    # Example: "s3://bucket/free/filename_free_480p.mp4"
+                    base_name = file_path.rpartition('/')[2]
+                    
+                    # Strip the tier-specific suffix to get the original filename
+                    # Example: "filename_free_480p.mp4" -> "filename"
+                    # Example: "filename_thumbnail.0000000.jpg" -> "filename"
+                    for suffix, suffix_length in TIER_SUFFIXES.items():
+                        if base_name.endswith(suffix):
+                            suffixes.add(suffix)
+                            if filename is None:
+                                filename = base_name[:-suffix_length]
+                            break
+                    else:
+                        if filename is None:
+                            marker_index = base_name.find(THUMBNAIL_MARKER)
+                            if marker_index > 0:
+                                filename = base_name[:marker_index]
+                    
+                    # Free job writes to /free/, full job to /standard/ and /premium/
+                    if job_type is None:
+                        if '/free/' in file_path:
+                            job_type = 'free'
+                        elif '/standard/' in file_path or '/premium/' in file_path:
+                            job_type = 'full'
+                    
+                    if thumbnail_filename is None and '/thumbnails/' in file_path and THUMBNAIL_MARKER in base_name:
+                        thumbnail_filename = base_name
+        
+        # Fallback to job details if no output reported a duration
+        if not duration_ms:
+            duration_ms = detail.get('jobDetails', {}).get('durationInMs')
         
     except Exception as e:
-        print(f"Error extracting duration: {str(e)}")
-        return None
\ No newline at end of file
+        print(f"Error parsing event outputs: {str(e)}")
+    
+    return EventOutputs(
+        filename=filename,
+        job_type=job_type or 'unknown',
+        thumbnail_filename=thumbnail_filename,
+        # Convert to seconds
+        duration=float(duration_ms) / 1000.0 if duration_ms else None,
+        suffixes=suffixes
+    )
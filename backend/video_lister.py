@@ -1,28 +1,174 @@
+import base64
 import json
 import boto3
+from botocore.config import Config
 import os
+import time
 from decimal import Decimal
 from boto3.dynamodb.conditions import Key, Attr
 import logging
+from concurrent.futures import ThreadPoolExecutor
+from itertools import chain
 
 # Configure logging
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
-# Initialize AWS clients
-dynamodb = boto3.resource('dynamodb')
+# Initialize AWS clients once per container so warm invocations reuse
+# pooled keep-alive connections; adaptive retries absorb throttling
+_boto_config = Config(
+    max_pool_connections=50,
+    retries={'mode': 'adaptive', 'total_max_attempts': 10},
+    tcp_keepalive=True
+)
+dynamodb = boto3.resource('dynamodb', config=_boto_config)
 table_name = os.environ.get('DYNAMODB_TABLE_NAME')
 table = dynamodb.Table(table_name) if table_name else None
 
+# Open a pooled connection during init so the first invocation skips the TLS handshake
+try:
+    dynamodb.meta.client.describe_endpoints()
+except Exception:
+    pass
+
+# Counter item maintained by the completion handler with the total number of videos
+VIDEO_COUNTER_ID = '__video_count__'
+
+# Constant partition key the completion handler stores on every video record
+ALL_VIDEOS_PARTITION = 'V'
+
+# Response headers are identical for every request, so share one dict each
+RESPONSE_HEADERS = {
+    'Content-Type': 'application/json',
+    'Access-Control-Allow-Origin': '*',
+    'Access-Control-Allow-Headers': 'Content-Type,X-Amz-Date,Authorization,X-Api-Key,X-Amz-Security-Token',
+    'Access-Control-Allow-Methods': 'GET,OPTIONS'
+}
+ERROR_HEADERS = {
+    'Content-Type': 'application/json',
+    'Access-Control-Allow-Origin': '*'
+}
+
+# Process-local read cache shared by warm invocations. Writes happen in other
+# Lambdas, so entries are not invalidated there; the TTL bounds staleness.
+CACHE_TTL_SECONDS = 30
+CACHE_MAX_ENTRIES = 1024
+_cache = {}
+
+# Only the attributes returned by the list view are read from DynamoDB
+LIST_PROJECTION = 'videoId,title,description,thumbnailUrl,#d,uploadDate,#s,availableQualities,fileSize,originalFilename'
+LIST_ATTR_NAMES = {'#d': 'duration', '#s': 'status'}
+
+# (response key, item attribute, default) for each field of a list entry
+LIST_FIELDS = (
+    ('id', 'videoId', None),
+    ('title', 'title', 'Untitled Video'),
+    ('description', 'description', ''),
+    ('thumbnail', 'thumbnailUrl', ''),
+    ('duration', 'duration', 0),
+    ('uploadDate', 'uploadDate', ''),
+    ('status', 'status', 'processing'),
+    ('qualities', 'availableQualities', ('480p',)),
+    ('fileSize', 'fileSize', 0),
+    ('originalFilename', 'originalFilename', '')
+)
+
 def decimal_default(obj):
     """JSON serializer for objects not serializable by default json code"""
     if isinstance(obj, Decimal):
         return float(obj)
     raise TypeError
 
+def encode_cursor(last_evaluated_key):
+    """Encode a DynamoDB LastEvaluatedKey as an opaque, URL-safe cursor"""
+    if not last_evaluated_key:
+        return None
+    raw = json.dumps(last_evaluated_key, default=decimal_default)
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+def decode_cursor(cursor):
+    """Decode a cursor produced by encode_cursor back into an ExclusiveStartKey"""
+    if not cursor:
+        return None
+    try:
+        return json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (ValueError, TypeError):
+        raise ValueError('Invalid pagination cursor')
+
+def get_total_video_count():
+    """
+    Read the running video count maintained by the completion handler.
+    This is a single GetItem instead of a full-table COUNT scan.
+    """
+    try:
+        response = table.get_item(Key={'videoId': VIDEO_COUNTER_ID})
+        item = response.get('Item')
+        return int(item.get('count', 0)) if item else None
+    except Exception as e:
+        logger.error(f"Error reading video count: {str(e)}")
+        return None
+
+def cache_get(key):
+    """Return a cached value if it has not expired yet"""
+    entry = _cache.get(key)
+    if entry is None:
+        return None
+    value, expires_at = entry
+    if expires_at <= time.monotonic():
+        _cache.pop(key, None)
+        return None
+    return value
+
+def cache_put(key, value):
+    """Cache a value for CACHE_TTL_SECONDS, evicting the oldest entry when full"""
+    if key not in _cache and len(_cache) >= CACHE_MAX_ENTRIES:
+        _cache.pop(next(iter(_cache)))
+    _cache[key] = (value, time.monotonic() + CACHE_TTL_SECONDS)
+
+def fetch_video_page(status_filter, start_key, limit):
+    """
+    Read one page of videos from DynamoDB
+    Returns (videos, next_cursor, total_items)
+    """
+    # Query DynamoDB for exactly one page of videos, resuming from the cursor
+    if status_filter:
+        query_kwargs = {
+            'IndexName': 'StatusIndex',
+            'KeyConditionExpression': Key('status').eq(status_filter),
+            'ScanIndexForward': False,  # Sort by upload date descending
+            'Limit': limit
+        }
+    else:
+        query_kwargs = {
+            'IndexName': 'AllVideosByDateIndex',
+            'KeyConditionExpression': Key('_all').eq(ALL_VIDEOS_PARTITION),
+            'ScanIndexForward': False,  # Newest uploads first
+            'Limit': limit
+        }
+    
+    query_kwargs['ProjectionExpression'] = LIST_PROJECTION
+    # boto3 merges the key condition's names into this dict, so pass a copy
+    query_kwargs['ExpressionAttributeNames'] = dict(LIST_ATTR_NAMES)
+    
+    if start_key:
+        query_kwargs['ExclusiveStartKey'] = start_key
+    response = table.query(**query_kwargs)
+    
+    items = response.get('Items', [])
+    next_cursor = encode_cursor(response.get('LastEvaluatedKey'))
+    
+    # Transform items for frontend
+    fields = LIST_FIELDS
+    videos = [{out_key: item.get(in_key, default) for out_key, in_key, default in fields} for item in items]
+    
+    # Totals are only tracked for the unfiltered listing
+    total_items = None if status_filter else get_total_video_count()
+    
+    return videos, next_cursor, total_items
+
 def lambda_handler(event, context):
     """
-    Lambda function to list videos with pagination
+    Lambda function to list videos with cursor-based pagination
     """
     try:
         # Parse query parameters
@@ -31,69 +177,28 @@ def lambda_handler(event, context):
         limit = int(query_params.get('limit', 12))
         status_filter = query_params.get('status')  # No default status filter
         
-        # Calculate pagination parameters
-        start_key = None
-        if page > 1:
-            # For simplicity, we'll use scan with limit and calculate offset
-            # In production, you might want to use pagination tokens
-            offset = (page - 1) * limit
-        else:
-            offset = 0
+        try:
+            start_key = decode_cursor(query_params.get('cursor'))
+        except ValueError as e:
+            return {
+                'statusCode': 400,
+                'headers': ERROR_HEADERS,
+                'body': json.dumps({'error': str(e)})
+            }
         
         logger.info(f"Listing videos - Page: {page}, Limit: {limit}, Status: {status_filter}")
         
-        # Query DynamoDB for videos
-        if status_filter:
-            response = table.query(
-                IndexName='StatusIndex',
-                KeyConditionExpression=Key('status').eq(status_filter),
-                ScanIndexForward=False,  # Sort by upload date descending
-                Limit=limit * page  # Get more items to handle pagination
-            )
-        else:
-            response = table.scan(
-                Limit=limit * page
-            )
+        cache_key = ('list', status_filter, query_params.get('cursor'), limit)
+        page_data = cache_get(cache_key)
+        if page_data is None:
+            page_data = fetch_video_page(status_filter, start_key, limit)
+            cache_put(cache_key, page_data)
+        videos, next_cursor, total_items = page_data
         
-        items = response.get('Items', [])
-        
-        # Handle pagination by slicing results
-        start_index = offset
-        end_index = start_index + limit
-        paginated_items = items[start_index:end_index]
-        
-        # Transform items for frontend
-        videos = []
-        for item in paginated_items:
-            video = {
-                'id': item.get('videoId'),
-                'title': item.get('title', 'Untitled Video'),
-                'description': item.get('description', ''),
-                'thumbnail': item.get('thumbnailUrl', ''),
-                'duration': item.get('duration', 0),
-                'uploadDate': item.get('uploadDate', ''),
-                'status': item.get('status', 'processing'),
-                'qualities': item.get('availableQualities', ['480p']),
-                'fileSize': item.get('fileSize', 0),
-                'originalFilename': item.get('originalFilename', '')
-            }
-            videos.append(video)
-        
-        # Calculate pagination info
-        total_items = len(items) if len(items) < limit * page else None
-        if total_items is None:
-            # If we got the full limit, there might be more items
-            # Do a count query to get total (expensive operation, consider caching)
-            count_response = table.query(
-                IndexName='StatusIndex',
-                KeyConditionExpression=Key('status').eq(status_filter),
-                Select='COUNT'
-            ) if status_filter else table.scan(Select='COUNT')
-            total_items = count_response.get('Count', 0)
-        
-        total_pages = (total_items + limit - 1) // limit if total_items > 0 else 1
-        has_next = page < total_pages
-        has_prev = page > 1
+        if total_items is not None:
+            total_pages = (total_items + limit - 1) // limit if total_items > 0 else 1
+        else:
+            total_pages = None
         
         # Prepare response
         response_data = {
@@ -103,41 +208,89 @@ def lambda_handler(event, context):
                 'totalPages': total_pages,
                 'totalItems': total_items,
                 'itemsPerPage': limit,
-                'hasNext': has_next,
-                'hasPrevious': has_prev
+                'hasNext': next_cursor is not None,
+                'hasPrevious': page > 1,
+                'nextCursor': next_cursor
             }
         }
         
+        # API Gateway gzips large bodies itself (MinimumCompressionSize)
         return {
             'statusCode': 200,
-            'headers': {
-                'Content-Type': 'application/json',
-                'Access-Control-Allow-Origin': '*',
-                'Access-Control-Allow-Headers': 'Content-Type,X-Amz-Date,Authorization,X-Api-Key,X-Amz-Security-Token',
-                'Access-Control-Allow-Methods': 'GET,OPTIONS'
-            },
-            'body': json.dumps(response_data, default=decimal_default)
+            'headers': RESPONSE_HEADERS,
+            'body': json.dumps(response_data, default=decimal_default, separators=(',', ':'))
         }
         
     except Exception as e:
         logger.error(f"Error listing videos: {str(e)}")
         return {
             'statusCode': 500,
-            'headers': {
-                'Content-Type': 'application/json',
-                'Access-Control-Allow-Origin': '*'
-            },
+            'headers': ERROR_HEADERS,
             'body': json.dumps({
                 'error': 'Internal server error',
                 'message': str(e)
             })
         }
 
+def parallel_scan(total_segments=8, **scan_kwargs):
+    """
+    Scan the whole table with segmented scans running concurrently
+    Only for paths where a scan is unavoidable (admin tooling, migrations);
+    list requests should use the indexed queries above. Read cost is the same
+    as a serial scan but is drawn from burst capacity faster.
+    total_segments must stay within the client's max_pool_connections.
+    """
+    def scan_segment(segment):
+        items = []
+        kwargs = dict(scan_kwargs, Segment=segment, TotalSegments=total_segments)
+        while True:
+            response = table.scan(**kwargs)
+            items.extend(response.get('Items', []))
+            if 'LastEvaluatedKey' not in response:
+                return items
+            kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+    
+    with ThreadPoolExecutor(max_workers=total_segments) as executor:
+        return list(chain.from_iterable(executor.map(scan_segment, range(total_segments))))
+
+def backfill_listing_attributes():
+    """
+    One-time migration for tables holding videos written before cursor listing:
+    sets the `_all` partition key that AllVideosByDateIndex needs and seeds the
+    video counter with the number of existing videos
+    Run once after deploying, while no uploads are being processed, since
+    completions landing during the scan would be counted twice or not at all
+    Returns the seeded video count
+    """
+    items = parallel_scan(
+        ProjectionExpression='videoId,#all',
+        ExpressionAttributeNames={'#all': '_all'}
+    )
+    videos = [item for item in items if item['videoId'] != VIDEO_COUNTER_ID]
+    
+    for item in videos:
+        if '_all' not in item:
+            table.update_item(
+                Key={'videoId': item['videoId']},
+                UpdateExpression='SET #all = :all',
+                ExpressionAttributeNames={'#all': '_all'},
+                ExpressionAttributeValues={':all': ALL_VIDEOS_PARTITION}
+            )
+    
+    table.put_item(Item={'videoId': VIDEO_COUNTER_ID, 'count': len(videos)})
+    logger.info(f"Backfilled {len(videos)} video records")
+    return len(videos)
+
 def get_video_by_id(video_id):
     """
     Get a specific video by ID
     """
     try:
+        cache_key = ('video', video_id)
+        video = cache_get(cache_key)
+        if video is not None:
+            return video
+        
         response = table.get_item(
             Key={'videoId': video_id}
         )
@@ -160,6 +313,7 @@ def get_video_by_id(video_id):
             'videoUrls': item.get('videoUrls', {})
         }
         
+        cache_put(cache_key, video)
         return video
         
     except Exception as e:
@@ -171,30 +325,36 @@ def update_video_metadata(video_id, metadata):
     Update video metadata in DynamoDB
     """
     try:
-        # Prepare update expression
-        update_expression = "SET "
-        expression_attribute_values = {}
+        # Use positional placeholders so any attribute name is safe,
+        # including reserved words and names that aren't valid identifiers
+        clauses = []
         expression_attribute_names = {}
+        expression_attribute_values = {}
         
-        for key, value in metadata.items():
-            if key != 'videoId':  # Don't update the primary key
-                attr_name = f"#{key}"
-                attr_value = f":{key}"
-                update_expression += f"{attr_name} = {attr_value}, "
-                expression_attribute_names[attr_name] = key
-                expression_attribute_values[attr_value] = value
+        for index, (key, value) in enumerate(metadata.items()):
+            if key == 'videoId':  # Don't update the primary key
+                continue
+            attr_name = f"#k{index}"
+            attr_value = f":v{index}"
+            clauses.append(f"{attr_name} = {attr_value}")
+            expression_attribute_names[attr_name] = key
+            expression_attribute_values[attr_value] = value
         
-        # Remove trailing comma and space
-        update_expression = update_expression.rstrip(', ')
+        # Nothing to write; skip the round trip
+        if not clauses:
+            return None
         
         response = table.update_item(
             Key={'videoId': video_id},
-            UpdateExpression=update_expression,
+            UpdateExpression='SET ' + ', '.join(clauses),
             ExpressionAttributeNames=expression_attribute_names,
             ExpressionAttributeValues=expression_attribute_values,
             ReturnValues='UPDATED_NEW'
         )
         
+        # Don't serve the pre-update item from this container's cache
+        _cache.pop(('video', video_id), None)
+        
         return response.get('Attributes')
         
     except Exception as e:
@@ -1,11 +1,255 @@
+import hashlib
 import json
 import boto3
+from botocore.config import Config
 import os
 import urllib.parse
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
-# Initialize AWS clients
-mediaconvert = boto3.client('mediaconvert')
-s3 = boto3.client('s3')
+# Configure logging
+logger = logging.getLogger()
+logger.setLevel(os.environ.get('LOG_LEVEL', 'INFO'))
+logging.getLogger('botocore').setLevel(logging.WARNING)
+
+# Initialize AWS clients once per container; keep-alive connections are reused
+# across warm invocations (one per concurrent job submission) and adaptive retries
+# back off on throttling instead of hammering the submit quota
+_boto_config = Config(
+    max_pool_connections=10,
+    retries={'mode': 'adaptive', 'max_attempts': 2},
+    tcp_keepalive=True
+)
+mediaconvert = boto3.client('mediaconvert', config=_boto_config)
+
+# Configuration read once per container
+MEDIACONVERT_ROLE = os.environ['MEDIACONVERT_ROLE']
+OUTPUT_BUCKET = os.environ['OUTPUT_BUCKET']
+
+# Extensions of uploads that get transcoded
+VIDEO_EXTENSIONS = frozenset(('.mp4', '.mov', '.avi', '.mkv', '.webm'))
+
+# Maximum concurrent probe/create_job calls per invocation (MediaConvert rate limits)
+JOB_SUBMIT_WORKERS = 10
+
+# Placeholder patched into the job templates per upload; the output bucket is
+# fixed for the container, so destinations are baked in at import
+INPUT_PLACEHOLDER = '__INPUT__'
+
+# Input settings shared by the free and full jobs
+_INPUT_BASE = {
+    "AudioSelectors": {
+        "Audio Selector 1": {
+            "Offset": 0,
+            "DefaultSelection": "DEFAULT",
+            "ProgramSelection": 1
+        }
+    },
+    "VideoSelector": {
+        "ColorSpace": "FOLLOW"
+    },
+    "FilterEnable": "AUTO",
+    "PsiControl": "USE_PSI",
+    "FilterStrength": 0,
+    "DeblockFilter": "DISABLED",
+    "DenoiseFilter": "DISABLED",
+    "FileInput": INPUT_PLACEHOLDER
+}
+
+# H264 settings shared by every rendition (Bitrate and CodecProfile vary)
+_H264_BASE = {
+    "InterlaceMode": "PROGRESSIVE",
+    "NumberReferenceFrames": 3,
+    "Syntax": "DEFAULT",
+    "Softness": 0,
+    "GopClosedCadence": 1,
+    "GopSize": 90,
+    "Slices": 1,
+    "GopBReference": "DISABLED",
+    "SlowPal": "DISABLED",
+    "SpatialAdaptiveQuantization": "ENABLED",
+    "TemporalAdaptiveQuantization": "ENABLED",
+    "FlickerAdaptiveQuantization": "DISABLED",
+    "EntropyEncoding": "CABAC",
+    "FramerateControl": "INITIALIZE_FROM_SOURCE",
+    "RateControlMode": "CBR",
+    "Telecine": "NONE",
+    "MinIInterval": 0,
+    "AdaptiveQuantization": "HIGH",
+    "CodecLevel": "AUTO",
+    "FieldEncoding": "PAFF",
+    "SceneChangeDetect": "ENABLED",
+    "QualityTuningLevel": "SINGLE_PASS",
+    "FramerateConversionAlgorithm": "DUPLICATE_DROP",
+    "UnregisteredSeiTimecode": "DISABLED",
+    "GopSizeUnits": "FRAMES",
+    "ParControl": "INITIALIZE_FROM_SOURCE",
+    "NumberBFramesBetweenReferenceFrames": 2,
+    "RepeatPps": "DISABLED"
+}
+
+# AAC settings shared by every rendition (Bitrate varies)
+_AAC_BASE = {
+    "AudioDescriptionBroadcasterMix": "NORMAL",
+    "RateControlMode": "CBR",
+    "CodecProfile": "LC",
+    "CodingMode": "CODING_MODE_2_0",
+    "RawFormat": "NONE",
+    "SampleRate": 48000,
+    "Specification": "MPEG4"
+}
+
+# Output renditions:
+# (group name, folder, name modifier, width, height, video bitrate, codec profile, audio bitrate)
+FREE_RENDITION = ('Free_Output', 'free', '_free_480p', 854, 480, 1_000_000, 'MAIN', 64_000)
+RENDITIONS = (
+    ('Standard_Output', 'standard', '_standard_480p', 854, 480, 2_000_000, 'MAIN', 96_000),
+    ('Premium_720p_Output', 'premium', '_premium_720p', 1280, 720, 4_000_000, 'HIGH', 128_000),
+    ('Premium_1080p_Output', 'premium', '_premium_1080p', 1920, 1080, 6_000_000, 'HIGH', 192_000)
+)
+
+def h264_output_group(name, folder, name_modifier, width, height, video_bitrate, codec_profile, audio_bitrate):
+    """
+    Build an MP4 file output group for one H264 rendition
+    """
+    return {
+        "Name": name,
+        "OutputGroupSettings": {
+            "Type": "FILE_GROUP_SETTINGS",
+            "FileGroupSettings": {
+                "Destination": f"s3://{OUTPUT_BUCKET}/{folder}/"
+            }
+        },
+        "Outputs": [{
+            "NameModifier": name_modifier,
+            "VideoDescription": {
+                "ScalingBehavior": "DEFAULT",
+                "TimecodeInsertion": "DISABLED",
+                "AntiAlias": "ENABLED",
+                "Sharpness": 50,
+                "CodecSettings": {
+                    "Codec": "H_264",
+                    "H264Settings": {**_H264_BASE, "Bitrate": video_bitrate, "CodecProfile": codec_profile}
+                },
+                "AfdSignaling": "NONE",
+                "DropFrameTimecode": "ENABLED",
+                "RespondToAfd": "NONE",
+                "ColorMetadata": "INSERT",
+                "Width": width,
+                "Height": height
+            },
+            "AudioDescriptions": [{
+                "AudioTypeControl": "FOLLOW_INPUT",
+                "CodecSettings": {
+                    "Codec": "AAC",
+                    "AacSettings": {**_AAC_BASE, "Bitrate": audio_bitrate}
+                },
+                "LanguageCodeControl": "FOLLOW_INPUT"
+            }],
+            "ContainerSettings": {
+                "Container": "MP4",
+                "Mp4Settings": {
+                    "CslgAtom": "INCLUDE",
+                    "FreeSpaceBox": "EXCLUDE",
+                    "MoovPlacement": "PROGRESSIVE_DOWNLOAD"
+                }
+            }
+        }]
+    }
+
+# Thumbnail generation
+_THUMBNAIL_GROUP = {
+    "Name": "Thumbnail_Output",
+    "OutputGroupSettings": {
+        "Type": "FILE_GROUP_SETTINGS",
+        "FileGroupSettings": {
+            "Destination": f"s3://{OUTPUT_BUCKET}/thumbnails/"
+        }
+    },
+    "Outputs": [{
+        "NameModifier": "_thumbnail",
+        "VideoDescription": {
+            "ScalingBehavior": "DEFAULT",
+            "TimecodeInsertion": "DISABLED",
+            "AntiAlias": "ENABLED",
+            "Sharpness": 50,
+            "CodecSettings": {
+                "Codec": "FRAME_CAPTURE",
+                "FrameCaptureSettings": {
+                    "FramerateNumerator": 1,
+                    "FramerateDenominator": 10,
+                    "MaxCaptures": 1,
+                    "Quality": 80
+                }
+            },
+            "Width": 1280,
+            "Height": 720
+        },
+        "ContainerSettings": {
+            "Container": "RAW"
+        }
+    }]
+}
+
+# Free version (480p, 10-second preview) job settings
+_FREE_TEMPLATE = {
+    "Role": MEDIACONVERT_ROLE,
+    "Settings": {
+        "Inputs": [{
+            **_INPUT_BASE,
+            "TimecodeSource": "ZEROBASED",
+            "InputClippings": [{
+                "StartTimecode": "00:00:00;00",
+                "EndTimecode": "00:00:10;00"
+            }]
+        }],
+        "OutputGroups": [h264_output_group(*FREE_RENDITION)]
+    }
+}
+
+def full_job_template(renditions):
+    """
+    Standard, premium and thumbnail job settings (full video) for the given renditions
+    """
+    return {
+        "Role": MEDIACONVERT_ROLE,
+        "Settings": {
+            "Inputs": [{**_INPUT_BASE, "TimecodeSource": "EMBEDDED"}],
+            "OutputGroups": [h264_output_group(*rendition) for rendition in renditions] + [_THUMBNAIL_GROUP]
+        }
+    }
+
+# Templates serialized once; each job is built with one str.replace call and a
+# C-level json.loads instead of a deepcopy of the nested dicts
+_FREE_TEMPLATE_JSON = json.dumps(_FREE_TEMPLATE)
+
+# Full job templates indexed by rendition count - 1: the standard 480p rendition
+# is always encoded, higher ones only when the source is large enough for them
+_FULL_TEMPLATE_JSONS = tuple(
+    json.dumps(full_job_template(RENDITIONS[:count])) for count in range(1, len(RENDITIONS) + 1)
+)
+
+# MediaConvert client bound to the account endpoint, created once per container
+# (the lock keeps parallel probes from building it twice on a cold start)
+_mc_client = None
+_mc_client_lock = threading.Lock()
+
+def get_mediaconvert_client():
+    """
+    Return a MediaConvert client for the account-specific endpoint
+    The endpoint never changes for an account, so it is taken from the
+    MEDIACONVERT_ENDPOINT env var when set, otherwise looked up once per cold start
+    """
+    global _mc_client
+    if _mc_client is None:
+        with _mc_client_lock:
+            if _mc_client is None:
+                endpoint_url = os.environ.get('MEDIACONVERT_ENDPOINT')
+                if not endpoint_url:
+                    endpoint_url = mediaconvert.describe_endpoints()['Endpoints'][0]['Url']
+                _mc_client = boto3.client('mediaconvert', endpoint_url=endpoint_url, config=_boto_config)
+    return _mc_client
 
 def lambda_handler(event, context):
     """
@@ -14,72 +258,53 @@ def lambda_handler(event, context):
     Also generates thumbnails
     """
     try:
-        print(f"Received event: {json.dumps(event)}")
+        logger.debug("Received event: %s", event)
         
-        # Get MediaConvert endpoint
-        endpoints = mediaconvert.describe_endpoints()
-        endpoint_url = endpoints['Endpoints'][0]['Url']
-        mc_client = boto3.client('mediaconvert', endpoint_url=endpoint_url)
+        records = event.get('Records') or ()
+        job_requests = []
+        failed_records = {}
+        job_ids = []
         
-        # Parse S3 event
-        for record in event['Records']:
-            bucket = record['s3']['bucket']['name']
-            key = urllib.parse.unquote_plus(record['s3']['object']['key'])
-            
-            print(f"Processing file: s3://{bucket}/{key}")
-            
-            # Skip if not a video file
-            if not key.lower().endswith(('.mp4', '.mov', '.avi', '.mkv', '.webm')):
-                print(f"Skipping non-video file: {key}")
-                continue
-            
-            input_uri = f's3://{bucket}/{key}'
-            output_bucket = os.environ['OUTPUT_BUCKET']
-            
-            # Extract filename without extension
-            filename = key.split('/')[-1].split('.')[0]
-            
-            # Create separate MediaConvert jobs for free version (clipped) and full versions
-            
-            # Job 1: Free version with 10-second clipping
-            free_job_settings = create_free_job_settings(input_uri, output_bucket, filename)
-            free_job_settings['UserMetadata'] = {
-                'originalFilename': filename,
-                'originalKey': key,
-                'inputBucket': bucket,
-                'jobType': 'free'
-            }
-            
-            free_response = mc_client.create_job(**free_job_settings)
-            free_job_id = free_response['Job']['Id']
-            print(f"MediaConvert free job created: {free_job_id} for file: {filename}")
+        # Bounded to stay under the MediaConvert probe/submit rate
+        with ThreadPoolExecutor(max_workers=JOB_SUBMIT_WORKERS) as executor:
+            # Build the free and full job requests for every video in the event
+            # (probing each source in parallel); a record that fails only marks
+            # itself as failed, never the whole batch
+            built = [(record, executor.submit(build_job_requests, record)) for record in records]
+            for record, future in built:
+                try:
+                    job_requests.extend((record, job_settings) for job_settings in future.result())
+                except Exception as e:
+                    logger.error("Error building jobs for record: %s", e)
+                    failed_records[id(record)] = record
             
-            # Job 2: Full versions (standard, premium, thumbnail)
-            full_job_settings = create_full_job_settings(input_uri, output_bucket, filename)
-            full_job_settings['UserMetadata'] = {
-                'originalFilename': filename,
-                'originalKey': key,
-                'inputBucket': bucket,
-                'jobType': 'full'
-            }
+            # Nothing to transcode: return before any MediaConvert call
+            if not job_requests:
+                return processing_response([], failed_records.values())
             
-            full_response = mc_client.create_job(**full_job_settings)
-            full_job_id = full_response['Job']['Id']
-            print(f"MediaConvert full job created: {full_job_id} for file: {filename}")
+            # Get MediaConvert client for the account endpoint
+            mc_client = get_mediaconvert_client()
             
-            # Return both job IDs
-            job_id = f"{free_job_id},{full_job_id}"
+            # Submit all jobs concurrently
+            futures = [
+                (record, job_settings, executor.submit(mc_client.create_job, **job_settings))
+                for record, job_settings in job_requests
+            ]
+            for record, job_settings, future in futures:
+                metadata = job_settings['UserMetadata']
+                try:
+                    job_id = future.result()['Job']['Id']
+                except Exception as e:
+                    logger.error("Error creating MediaConvert %s job for file %s: %s", metadata['jobType'], metadata['originalFilename'], e)
+                    failed_records[id(record)] = record
+                    continue
+                logger.info("MediaConvert %s job created: %s for file: %s", metadata['jobType'], job_id, metadata['originalFilename'])
+                job_ids.append(job_id)
         
-        return {
-            'statusCode': 200,
-            'body': json.dumps({
-                'message': 'Video processing initiated successfully',
-                'jobId': job_id
-            })
-        }
+        return processing_response(job_ids, failed_records.values())
         
     except Exception as e:
-        print(f"Error processing video: {str(e)}")
+        logger.error("Error processing video: %s", e)
         return {
             'statusCode': 500,
             'body': json.dumps({
@@ -87,621 +312,163 @@ def lambda_handler(event, context):
             })
         }
 
-def create_free_job_settings(input_uri, output_bucket, filename):
+def processing_response(job_ids, failed_records):
     """
-    Create MediaConvert job settings for free version (10-second preview)
+    Build the handler response
+    Failed SQS records are listed in batchItemFailures so only they are redriven;
+    failed S3 notification records are logged and reported by key
     """
+    batch_item_failures = []
+    failed_keys = []
+    for record in failed_records:
+        if 'messageId' in record:
+            batch_item_failures.append({'itemIdentifier': record['messageId']})
+        else:
+            failed_keys.append(record.get('s3', {}).get('object', {}).get('key'))
+    
+    failed = bool(failed_keys or batch_item_failures)
+    if job_ids:
+        message = 'Video processing initiated successfully'
+    elif failed:
+        message = 'Failed to process video'
+    else:
+        message = 'No videos to process'
     
     return {
-        "Role": os.environ['MEDIACONVERT_ROLE'],
-        "Settings": {
-            "Inputs": [{
-                "AudioSelectors": {
-                    "Audio Selector 1": {
-                        "Offset": 0,
-                        "DefaultSelection": "DEFAULT",
-                        "ProgramSelection": 1
-                    }
-                },
-                "VideoSelector": {
-                    "ColorSpace": "FOLLOW"
-                },
-                "FilterEnable": "AUTO",
-                "PsiControl": "USE_PSI",
-                "FilterStrength": 0,
-                "DeblockFilter": "DISABLED",
-                "DenoiseFilter": "DISABLED",
-                "TimecodeSource": "ZEROBASED",
-                "FileInput": input_uri,
-                "InputClippings": [{
-                    "StartTimecode": "00:00:00;00",
-                    "EndTimecode": "00:00:10;00"
-                }]
-            }],
-            "OutputGroups": [
-                # Free version (480p, 10 seconds preview)
-                {
-                    "Name": "Free_Output",
-                    "OutputGroupSettings": {
-                        "Type": "FILE_GROUP_SETTINGS",
-                        "FileGroupSettings": {
-                            "Destination": f"s3://{output_bucket}/free/"
-                        }
-                    },
-                    "Outputs": [{
-                        "NameModifier": "_free_480p",
-                        "VideoDescription": {
-                            "TimecodeInsertion": "DISABLED", 
-                            "ScalingBehavior": "DEFAULT",
-                            "AntiAlias": "ENABLED",
-                            "Sharpness": 50,
-
-                            "CodecSettings": {
-                                "Codec": "H_264",
-                                "H264Settings": {
-                                    "InterlaceMode": "PROGRESSIVE",
-                                    "NumberReferenceFrames": 3,
-                                    "Syntax": "DEFAULT",
-                                    "Softness": 0,
-                                    "GopClosedCadence": 1,
-                                    "GopSize": 90,
-                                    "Slices": 1,
-                                    "GopBReference": "DISABLED",
-                                    "SlowPal": "DISABLED",
-                                    "SpatialAdaptiveQuantization": "ENABLED",
-                                    "TemporalAdaptiveQuantization": "ENABLED",
-                                    "FlickerAdaptiveQuantization": "DISABLED",
-                                    "EntropyEncoding": "CABAC",
-                                    "Bitrate": 1000000,
-                                    "FramerateControl": "INITIALIZE_FROM_SOURCE",
-                                    "RateControlMode": "CBR",
-                                    "CodecProfile": "MAIN",
-                                    "Telecine": "NONE",
-                                    "MinIInterval": 0,
-                                    "AdaptiveQuantization": "HIGH",
-                                    "CodecLevel": "AUTO",
-                                    "FieldEncoding": "PAFF",
-                                    "SceneChangeDetect": "ENABLED",
-                                    "QualityTuningLevel": "SINGLE_PASS",
-                                    "FramerateConversionAlgorithm": "DUPLICATE_DROP",
-                                    "UnregisteredSeiTimecode": "DISABLED",
-                                    "GopSizeUnits": "FRAMES",
-                                    "ParControl": "INITIALIZE_FROM_SOURCE",
-                                    "NumberBFramesBetweenReferenceFrames": 2,
-                                    "RepeatPps": "DISABLED"
-                                }
-                            },
-                            "AfdSignaling": "NONE",
-                            "DropFrameTimecode": "ENABLED",
-                            "RespondToAfd": "NONE",
-                            "ColorMetadata": "INSERT",
-                            "Width": 854,
-                            "Height": 480
-                        },
-                        "AudioDescriptions": [{
-                            "AudioTypeControl": "FOLLOW_INPUT",
-                            "CodecSettings": {
-                                "Codec": "AAC",
-                                "AacSettings": {
-                                    "AudioDescriptionBroadcasterMix": "NORMAL",
-                                    "Bitrate": 64000,
-                                    "RateControlMode": "CBR",
-                                    "CodecProfile": "LC",
-                                    "CodingMode": "CODING_MODE_2_0",
-                                    "RawFormat": "NONE",
-                                    "SampleRate": 48000,
-                                    "Specification": "MPEG4"
-                                }
-                            },
-                            "LanguageCodeControl": "FOLLOW_INPUT"
-                        }],
-                        "ContainerSettings": {
-                            "Container": "MP4",
-                            "Mp4Settings": {
-                                "CslgAtom": "INCLUDE",
-                                "FreeSpaceBox": "EXCLUDE",
-                                "MoovPlacement": "PROGRESSIVE_DOWNLOAD"
-                            }
-                        }
-                    }]
-                }
-            ]
-        }
+        'statusCode': 500 if failed and not job_ids else 200,
+        'body': json.dumps({
+            'message': message,
+            'jobId': ','.join(job_ids),
+            'jobIds': job_ids,
+            'failedKeys': failed_keys
+        }),
+        'batchItemFailures': batch_item_failures
     }
 
-def create_full_job_settings(input_uri, output_bucket, filename):
+def job_request_token(bucket, key, etag, job_type):
     """
-    Create MediaConvert job settings for standard, premium versions and thumbnails
+    ClientRequestToken for create_job: the same upload and job type always
+    yields the same token. MediaConvert only honours a reused token for about
+    one minute after the original request succeeded, so this absorbs quick
+    retries but a later redelivery still starts a duplicate job
     """
+    return hashlib.sha1(f"{bucket}/{key}/{etag}/{job_type}".encode()).hexdigest()
+
+def build_job_requests(record):
+    """
+    Build the free (clipped) and full MediaConvert job settings for one S3 (or SQS) record
+    Returns an empty list for files that are not videos
+    """
+    # S3 notifications delivered through SQS carry the S3 event in the message body
+    if 'body' in record:
+        s3_records = json.loads(record['body']).get('Records', ())
+        return [job_settings for s3_record in s3_records for job_settings in build_job_requests(s3_record)]
     
-    return {
-        "Role": os.environ['MEDIACONVERT_ROLE'],
-        "Settings": {
-            "Inputs": [{
-                "AudioSelectors": {
-                    "Audio Selector 1": {
-                        "Offset": 0,
-                        "DefaultSelection": "DEFAULT",
-                        "ProgramSelection": 1
-                    }
-                },
-                "VideoSelector": {
-                    "ColorSpace": "FOLLOW"
-                },
-                "FilterEnable": "AUTO",
-                "PsiControl": "USE_PSI",
-                "FilterStrength": 0,
-                "DeblockFilter": "DISABLED",
-                "DenoiseFilter": "DISABLED",
-                "TimecodeSource": "EMBEDDED",
-                "FileInput": input_uri
-            }],
-            "OutputGroups": [
-                # Standard version (480p, full video)
-                {
-                    "Name": "Standard_Output",
-                    "OutputGroupSettings": {
-                        "Type": "FILE_GROUP_SETTINGS",
-                        "FileGroupSettings": {
-                            "Destination": f"s3://{output_bucket}/standard/"
-                        }
-                    },
-                    "Outputs": [{
-                        "NameModifier": "_standard_480p",
-                        "VideoDescription": {
-                            "ScalingBehavior": "DEFAULT",
-                            "TimecodeInsertion": "DISABLED",
-                            "AntiAlias": "ENABLED",
-                            "Sharpness": 50,
-                            "CodecSettings": {
-                                "Codec": "H_264",
-                                "H264Settings": {
-                                    "InterlaceMode": "PROGRESSIVE",
-                                    "NumberReferenceFrames": 3,
-                                    "Syntax": "DEFAULT",
-                                    "Softness": 0,
-                                    "GopClosedCadence": 1,
-                                    "GopSize": 90,
-                                    "Slices": 1,
-                                    "GopBReference": "DISABLED",
-                                    "SlowPal": "DISABLED",
-                                    "SpatialAdaptiveQuantization": "ENABLED",
-                                    "TemporalAdaptiveQuantization": "ENABLED",
-                                    "FlickerAdaptiveQuantization": "DISABLED",
-                                    "EntropyEncoding": "CABAC",
-                                    "Bitrate": 2000000,
-                                    "FramerateControl": "INITIALIZE_FROM_SOURCE",
-                                    "RateControlMode": "CBR",
-                                    "CodecProfile": "MAIN",
-                                    "Telecine": "NONE",
-                                    "MinIInterval": 0,
-                                    "AdaptiveQuantization": "HIGH",
-                                    "CodecLevel": "AUTO",
-                                    "FieldEncoding": "PAFF",
-                                    "SceneChangeDetect": "ENABLED",
-                                    "QualityTuningLevel": "SINGLE_PASS",
-                                    "FramerateConversionAlgorithm": "DUPLICATE_DROP",
-                                    "UnregisteredSeiTimecode": "DISABLED",
-                                    "GopSizeUnits": "FRAMES",
-                                    "ParControl": "INITIALIZE_FROM_SOURCE",
-                                    "NumberBFramesBetweenReferenceFrames": 2,
-                                    "RepeatPps": "DISABLED"
-                                }
-                            },
-                            "AfdSignaling": "NONE",
-                            "DropFrameTimecode": "ENABLED",
-                            "RespondToAfd": "NONE",
-                            "ColorMetadata": "INSERT",
-                            "Width": 854,
-                            "Height": 480
-                        },
-                        "AudioDescriptions": [{
-                            "AudioTypeControl": "FOLLOW_INPUT",
-                            "CodecSettings": {
-                                "Codec": "AAC",
-                                "AacSettings": {
-                                    "AudioDescriptionBroadcasterMix": "NORMAL",
-                                    "Bitrate": 96000,
-                                    "RateControlMode": "CBR",
-                                    "CodecProfile": "LC",
-                                    "CodingMode": "CODING_MODE_2_0",
-                                    "RawFormat": "NONE",
-                                    "SampleRate": 48000,
-                                    "Specification": "MPEG4"
-                                }
-                            },
-                            "LanguageCodeControl": "FOLLOW_INPUT"
-                        }],
-                        "ContainerSettings": {
-                            "Container": "MP4",
-                            "Mp4Settings": {
-                                "CslgAtom": "INCLUDE",
-                                "FreeSpaceBox": "EXCLUDE",
-                                "MoovPlacement": "PROGRESSIVE_DOWNLOAD"
-                            }
-                        }
-                    }]
-                },
-                # Premium 720p version (full video)
-                {
-                    "Name": "Premium_720p_Output",
-                    "OutputGroupSettings": {
-                        "Type": "FILE_GROUP_SETTINGS",
-                        "FileGroupSettings": {
-                            "Destination": f"s3://{output_bucket}/premium/"
-                        }
-                    },
-                    "Outputs": [{
-                        "NameModifier": "_premium_720p",
-                        "VideoDescription": {
-                            "ScalingBehavior": "DEFAULT",
-                            "TimecodeInsertion": "DISABLED",
-                            "AntiAlias": "ENABLED",
-                            "Sharpness": 50,
-                            "CodecSettings": {
-                                "Codec": "H_264",
-                                "H264Settings": {
-                                    "InterlaceMode": "PROGRESSIVE",
-                                    "NumberReferenceFrames": 3,
-                                    "Syntax": "DEFAULT",
-                                    "Softness": 0,
-                                    "GopClosedCadence": 1,
-                                    "GopSize": 90,
-                                    "Slices": 1,
-                                    "GopBReference": "DISABLED",
-                                    "SlowPal": "DISABLED",
-                                    "SpatialAdaptiveQuantization": "ENABLED",
-                                    "TemporalAdaptiveQuantization": "ENABLED",
-                                    "FlickerAdaptiveQuantization": "DISABLED",
-                                    "EntropyEncoding": "CABAC",
-                                    "Bitrate": 4000000,
-                                    "FramerateControl": "INITIALIZE_FROM_SOURCE",
-                                    "RateControlMode": "CBR",
-                                    "CodecProfile": "HIGH",
-                                    "Telecine": "NONE",
-                                    "MinIInterval": 0,
-                                    "AdaptiveQuantization": "HIGH",
-                                    "CodecLevel": "AUTO",
-                                    "FieldEncoding": "PAFF",
-                                    "SceneChangeDetect": "ENABLED",
-                                    "QualityTuningLevel": "SINGLE_PASS",
-                                    "FramerateConversionAlgorithm": "DUPLICATE_DROP",
-                                    "UnregisteredSeiTimecode": "DISABLED",
-                                    "GopSizeUnits": "FRAMES",
-                                    "ParControl": "INITIALIZE_FROM_SOURCE",
-                                    "NumberBFramesBetweenReferenceFrames": 2,
-                                    "RepeatPps": "DISABLED"
-                                }
-                            },
-                            "AfdSignaling": "NONE",
-                            "DropFrameTimecode": "ENABLED",
-                            "RespondToAfd": "NONE",
-                            "ColorMetadata": "INSERT",
-                            "Width": 1280,
-                            "Height": 720
-                        },
-                        "AudioDescriptions": [{
-                            "AudioTypeControl": "FOLLOW_INPUT",
-                            "CodecSettings": {
-                                "Codec": "AAC",
-                                "AacSettings": {
-                                    "AudioDescriptionBroadcasterMix": "NORMAL",
-                                    "Bitrate": 128000,
-                                    "RateControlMode": "CBR",
-                                    "CodecProfile": "LC",
-                                    "CodingMode": "CODING_MODE_2_0",
-                                    "RawFormat": "NONE",
-                                    "SampleRate": 48000,
-                                    "Specification": "MPEG4"
-                                }
-                            },
-                            "LanguageCodeControl": "FOLLOW_INPUT"
-                        }],
-                        "ContainerSettings": {
-                            "Container": "MP4",
-                            "Mp4Settings": {
-                                "CslgAtom": "INCLUDE",
-                                "FreeSpaceBox": "EXCLUDE",
-                                "MoovPlacement": "PROGRESSIVE_DOWNLOAD"
-                            }
-                        }
-                    }]
-                },
-                # Premium 1080p version (full video)
-                {
-                    "Name": "Premium_1080p_Output",
-                    "OutputGroupSettings": {
-                        "Type": "FILE_GROUP_SETTINGS",
-                        "FileGroupSettings": {
-                            "Destination": f"s3://{output_bucket}/premium/"
-                        }
-                    },
-                    "Outputs": [{
-                        "NameModifier": "_premium_1080p",
-                        "VideoDescription": {
-                            "ScalingBehavior": "DEFAULT",
-                            "TimecodeInsertion": "DISABLED",
-                            "AntiAlias": "ENABLED",
-                            "Sharpness": 50,
-                            "CodecSettings": {
-                                "Codec": "H_264",
-                                "H264Settings": {
-                                    "InterlaceMode": "PROGRESSIVE",
-                                    "NumberReferenceFrames": 3,
-                                    "Syntax": "DEFAULT",
-                                    "Softness": 0,
-                                    "GopClosedCadence": 1,
-                                    "GopSize": 90,
-                                    "Slices": 1,
-                                    "GopBReference": "DISABLED",
-                                    "SlowPal": "DISABLED",
-                                    "SpatialAdaptiveQuantization": "ENABLED",
-                                    "TemporalAdaptiveQuantization": "ENABLED",
-                                    "FlickerAdaptiveQuantization": "DISABLED",
-                                    "EntropyEncoding": "CABAC",
-                                    "Bitrate": 6000000,
-                                    "FramerateControl": "INITIALIZE_FROM_SOURCE",
-                                    "RateControlMode": "CBR",
-                                    "CodecProfile": "HIGH",
-                                    "Telecine": "NONE",
-                                    "MinIInterval": 0,
-                                    "AdaptiveQuantization": "HIGH",
-                                    "CodecLevel": "AUTO",
-                                    "FieldEncoding": "PAFF",
-                                    "SceneChangeDetect": "ENABLED",
-                                    "QualityTuningLevel": "SINGLE_PASS",
-                                    "FramerateConversionAlgorithm": "DUPLICATE_DROP",
-                                    "UnregisteredSeiTimecode": "DISABLED",
-                                    "GopSizeUnits": "FRAMES",
-                                    "ParControl": "INITIALIZE_FROM_SOURCE",
-                                    "NumberBFramesBetweenReferenceFrames": 2,
-                                    "RepeatPps": "DISABLED"
-                                }
-                            },
-                            "AfdSignaling": "NONE",
-                            "DropFrameTimecode": "ENABLED",
-                            "RespondToAfd": "NONE",
-                            "ColorMetadata": "INSERT",
-                            "Width": 1920,
-                            "Height": 1080
-                        },
-                        "AudioDescriptions": [{
-                            "AudioTypeControl": "FOLLOW_INPUT",
-                            "CodecSettings": {
-                                "Codec": "AAC",
-                                "AacSettings": {
-                                    "AudioDescriptionBroadcasterMix": "NORMAL",
-                                    "Bitrate": 192000,
-                                    "RateControlMode": "CBR",
-                                    "CodecProfile": "LC",
-                                    "CodingMode": "CODING_MODE_2_0",
-                                    "RawFormat": "NONE",
-                                    "SampleRate": 48000,
-                                    "Specification": "MPEG4"
-                                }
-                            },
-                            "LanguageCodeControl": "FOLLOW_INPUT"
-                        }],
-                        "ContainerSettings": {
-                            "Container": "MP4",
-                            "Mp4Settings": {
-                                "CslgAtom": "INCLUDE",
-                                "FreeSpaceBox": "EXCLUDE",
-                                "MoovPlacement": "PROGRESSIVE_DOWNLOAD"
-                            }
-                        }
-                    }]
-                },
-                # Thumbnail generation
-                {
-                    "Name": "Thumbnail_Output",
-                    "OutputGroupSettings": {
-                        "Type": "FILE_GROUP_SETTINGS",
-                        "FileGroupSettings": {
-                            "Destination": f"s3://{output_bucket}/thumbnails/"
-                        }
-                    },
-                    "Outputs": [{
-                        "NameModifier": "_thumbnail",
-                        "VideoDescription": {
-                            "ScalingBehavior": "DEFAULT",
-                            "TimecodeInsertion": "DISABLED",
-                            "AntiAlias": "ENABLED",
-                            "Sharpness": 50,
-                            "CodecSettings": {
-                                "Codec": "FRAME_CAPTURE",
-                                "FrameCaptureSettings": {
-                                    "FramerateNumerator": 1,
-                                    "FramerateDenominator": 10,
-                                    "MaxCaptures": 1,
-                                    "Quality": 80
-                                }
-                            },
-                            "Width": 1280,
-                            "Height": 720
-                        },
-                        "ContainerSettings": {
-                            "Container": "RAW"
-                        }
-                    }]
-                }
-            ]
-        }
+    bucket = record['s3']['bucket']['name']
+    key = urllib.parse.unquote_plus(record['s3']['object']['key'])
+    
+    logger.info("Processing file: s3://%s/%s", bucket, key)
+    
+    # Parse the key once: extension for the filter, basename for output naming
+    base, extension = os.path.splitext(key)
+    
+    # Skip if not a video file
+    if extension.lower() not in VIDEO_EXTENSIONS:
+        logger.info("Skipping non-video file: %s", key)
+        return []
+    
+    input_uri = f's3://{bucket}/{key}'
+    etag = record['s3']['object'].get('eTag', '')
+    
+    # Source resolution decides which renditions are worth encoding (no upscaling)
+    source_dimensions = probe_source_dimensions(input_uri)
+    
+    # Filename without directory or final extension ("my.video.mp4" -> "my.video")
+    filename = os.path.basename(base)
+    
+    # Create separate MediaConvert jobs for free version (clipped) and full versions
+    
+    # Job 1: Free version with 10-second clipping
+    free_job_settings = create_free_job_settings(input_uri)
+    free_job_settings['UserMetadata'] = {
+        'originalFilename': filename,
+        'originalKey': key,
+        'inputBucket': bucket,
+        'jobType': 'free'
     }
+    free_job_settings['ClientRequestToken'] = job_request_token(bucket, key, etag, 'free')
     
-    return job_settings
+    # Job 2: Full versions (standard, premium, thumbnail)
+    full_job_settings = create_full_job_settings(input_uri, source_dimensions)
+    full_job_settings['UserMetadata'] = {
+        'originalFilename': filename,
+        'originalKey': key,
+        'inputBucket': bucket,
+        'jobType': 'full'
+    }
+    full_job_settings['ClientRequestToken'] = job_request_token(bucket, key, etag, 'full')
+    
+    return [free_job_settings, full_job_settings]
+
+def create_free_job_settings(input_uri):
+    """
+    Create MediaConvert job settings for free version (10-second preview)
+    """
+    return fill_job_template(_FREE_TEMPLATE_JSON, input_uri)
+
+def create_full_job_settings(input_uri, source_dimensions=None):
+    """
+    Create MediaConvert job settings for standard, premium versions and thumbnails
+    Renditions larger than the source are left out instead of being upscaled
+    """
+    return fill_job_template(_FULL_TEMPLATE_JSONS[rendition_count(source_dimensions) - 1], input_uri)
+
+def rendition_count(source_dimensions):
+    """
+    Number of leading RENDITIONS to encode for a source of (long side, short side)
+    A rendition is kept when the source matches it on either side, so portrait and
+    letterboxed sources still get the renditions they can fill
+    """
+    if not source_dimensions:
+        return len(RENDITIONS)
+    long_side, short_side = source_dimensions
+    count = 1
+    for _, _, _, width, height, _, _, _ in RENDITIONS[1:]:
+        if long_side < width and short_side < height:
+            break
+        count += 1
+    return count
+
+def probe_source_dimensions(input_uri):
+    """
+    Read the source video size with the MediaConvert Probe API
+    Returns (long side, short side), or None when the probe is unavailable or
+    fails, in which case every rendition is encoded as before
+    """
+    try:
+        response = get_mediaconvert_client().probe(InputFiles=[{'FileUrl': input_uri}])
+        for result in response.get('ProbeResults', ()):
+            for track in result.get('Container', {}).get('Tracks', ()):
+                if track.get('TrackType') != 'video':
+                    continue
+                video = track.get('VideoProperties', {})
+                width, height = video.get('Width'), video.get('Height')
+                if width and height:
+                    return max(width, height), min(width, height)
+    except Exception as e:
+        logger.warning("Could not probe %s, encoding all renditions: %s", input_uri, e)
+    return None
+
+def fill_job_template(template_json, input_uri):
+    """
+    Build job settings from a pre-serialized template by substituting the
+    input file into the JSON text and parsing it back
+    """
+    # Escape the URI so quotes or backslashes in the key stay valid JSON
+    return json.loads(template_json.replace(INPUT_PLACEHOLDER, json.dumps(input_uri)[1:-1]))
 
 # All video metadata handling is now done by the MediaConvert completion handler
 # This Lambda only creates MediaConvert jobs
 
 # MediaConvert job completion is now handled by a separate Lambda function
 # triggered by EventBridge events when jobs complete
-    """Create MediaConvert job settings for all three user types"""
-    
-    return {
-        "Role": os.environ['MEDIACONVERT_ROLE'],
-        "Settings": {
-            "Inputs": [{
-                "FileInput": input_uri,
-                "AudioSelectors": {
-                    "Audio Selector 1": {
-                        "DefaultSelection": "DEFAULT"
-                    }
-                },
-                "VideoSelector": {},
-                "TimecodeSource": "ZEROBASED"
-            }],
-            "OutputGroups": [
-                # Premium quality (full video, highest quality)
-                {
-                    "Name": "Premium_Output",
-                    "OutputGroupSettings": {
-                        "Type": "FILE_GROUP_SETTINGS",
-                        "FileGroupSettings": {
-                            "Destination": f"s3://{output_bucket}/premium/"
-                        }
-                    },
-                    "Outputs": [{
-                        "NameModifier": "_premium_1080p",
-                        "VideoDescription": {
-                            "CodecSettings": {
-                                "Codec": "H_264",
-                                "H264Settings": {
-                                    "Bitrate": 8000000,  # 8 Mbps
-                                    "RateControlMode": "CBR",
-                                    "Profile": "HIGH",
-                                    "Level": "H264_LEVEL_4_1",
-                                    "GopSize": 30,
-                                    "NumberBFramesBetweenReferenceFrames": 2
-                                }
-                            },
-                            "Width": 1920,
-                            "Height": 1080,
-                            "RespondToAfd": "NONE",
-                            "ScalingBehavior": "DEFAULT"
-                        },
-                        "AudioDescriptions": [{
-                            "CodecSettings": {
-                                "Codec": "AAC",
-                                "AacSettings": {
-                                    "Bitrate": 128000,
-                                    "SampleRate": 48000,
-                                    "CodingMode": "CODING_MODE_2_0"
-                                }
-                            }
-                        }],
-                        "ContainerSettings": {
-                            "Container": "MP4",
-                            "Mp4Settings": {
-                                "CslgAtom": "INCLUDE",
-                                "FreeSpaceBox": "EXCLUDE",
-                                "MoovPlacement": "PROGRESSIVE_DOWNLOAD"
-                            }
-                        }
-                    }]
-                },
-                
-                # Saving plan (medium quality, with ad insertion points)
-                {
-                    "Name": "Saving_Output",
-                    "OutputGroupSettings": {
-                        "Type": "FILE_GROUP_SETTINGS",
-                        "FileGroupSettings": {
-                            "Destination": f"s3://{output_bucket}/saving/"
-                        }
-                    },
-                    "Outputs": [{
-                        "NameModifier": "_saving_720p",
-                        "VideoDescription": {
-                            "CodecSettings": {
-                                "Codec": "H_264",
-                                "H264Settings": {
-                                    "Bitrate": 4000000,  # 4 Mbps
-                                    "RateControlMode": "CBR",
-                                    "Profile": "HIGH",
-                                    "Level": "H264_LEVEL_3_1",
-                                    "GopSize": 30,
-                                    "NumberBFramesBetweenReferenceFrames": 2
-                                }
-                            },
-                            "Width": 1280,
-                            "Height": 720,
-                            "RespondToAfd": "NONE",
-                            "ScalingBehavior": "DEFAULT"
-                        },
-                        "AudioDescriptions": [{
-                            "CodecSettings": {
-                                "Codec": "AAC",
-                                "AacSettings": {
-                                    "Bitrate": 96000,
-                                    "SampleRate": 48000,
-                                    "CodingMode": "CODING_MODE_2_0"
-                                }
-                            }
-                        }],
-                        "ContainerSettings": {
-                            "Container": "MP4",
-                            "Mp4Settings": {
-                                "CslgAtom": "INCLUDE",
-                                "FreeSpaceBox": "EXCLUDE",
-                                "MoovPlacement": "PROGRESSIVE_DOWNLOAD"
-                            }
-                        }
-                    }]
-                },
-                
-                # Trial (15 seconds, lower quality)
-                {
-                    "Name": "Trial_Output",
-                    "OutputGroupSettings": {
-                        "Type": "FILE_GROUP_SETTINGS",
-                        "FileGroupSettings": {
-                            "Destination": f"s3://{output_bucket}/trial/"
-                        }
-                    },
-                    "Outputs": [{
-                        "NameModifier": "_trial_480p",
-                        "VideoDescription": {
-                            "CodecSettings": {
-                                "Codec": "H_264",
-                                "H264Settings": {
-                                    "Bitrate": 2000000,  # 2 Mbps
-                                    "RateControlMode": "CBR",
-                                    "Profile": "MAIN",
-                                    "Level": "H264_LEVEL_3_0",
-                                    "GopSize": 30
-                                }
-                            },
-                            "Width": 854,
-                            "Height": 480,
-                            "RespondToAfd": "NONE",
-                            "ScalingBehavior": "DEFAULT"
-                        },
-                        "AudioDescriptions": [{
-                            "CodecSettings": {
-                                "Codec": "AAC",
-                                "AacSettings": {
-                                    "Bitrate": 64000,
-                                    "SampleRate": 48000,
-                                    "CodingMode": "CODING_MODE_2_0"
-                                }
-                            }
-                        }],
-                        "ContainerSettings": {
-                            "Container": "MP4",
-                            "Mp4Settings": {
-                                "CslgAtom": "INCLUDE",
-                                "FreeSpaceBox": "EXCLUDE",
-                                "MoovPlacement": "PROGRESSIVE_DOWNLOAD"
-                            }
-                        }
-                    }]
-                }
-            ],
-            "TimecodeConfig": {
-                "Source": "ZEROBASED"
-            }
-        }
-    }
-
-
@@ -1,23 +1,162 @@
+import base64
 import json
 import boto3
-import jwt
 import os
-from datetime import datetime, timedelta
-from botocore.exceptions import ClientError
-from decimal import Decimal
+from botocore.config import Config
+from botocore.exceptions import BotoCoreError, ClientError
+from concurrent.futures import ThreadPoolExecutor
 import time
-import hashlib
-import hmac
+import logging
 
-# Initialize AWS clients
-s3 = boto3.client('s3')
-cognito = boto3.client('cognito-idp')
-cloudfront = boto3.client('cloudfront')
-dynamodb = boto3.resource('dynamodb')
+# Modules used off the request path (hmac/hashlib for validation tokens,
+# datetime for error timestamps, cryptography for URL signing) are imported
+# inside the functions that need them to keep cold-start imports small
 
-# Get DynamoDB table
+# Configure logging; request details (event, headers, token claims) are only
+# formatted and written when LOG_LEVEL is DEBUG
+logger = logging.getLogger()
+logger.setLevel(os.environ.get('LOG_LEVEL', 'INFO'))
+
+# Initialize AWS clients once per container so warm invocations reuse pooled
+# keep-alive connections; short timeouts and few retries keep a slow dependency
+# from holding the request open
+_boto_config = Config(
+    tcp_keepalive=True,
+    max_pool_connections=10,
+    connect_timeout=1,
+    read_timeout=2,
+    retries={'mode': 'standard', 'max_attempts': 2}
+)
+cognito = boto3.client('cognito-idp', config=_boto_config)
+# Low-level client: the few projected attributes are decoded by from_av,
+# skipping the resource layer's TypeDeserializer and its Decimal values
+ddb = boto3.client('dynamodb', config=_boto_config)
+
+# Configuration read once per container; a missing required value fails the
+# init phase instead of the first request
 table_name = os.environ.get('DYNAMODB_TABLE_NAME')
-table = dynamodb.Table(table_name) if table_name else None
+USER_POOL_ID = os.environ['USER_POOL_ID']
+DAX_ENDPOINT = os.environ.get('DAX_ENDPOINT')
+JWT_SECRET = os.environ.get('JWT_SECRET', 'default-secret').encode()
+
+def create_metadata_reader():
+    """
+    Client for video metadata reads: a DAX client when DAX_ENDPOINT is set and the
+    amazondax package is deployed (it takes the same low-level get_item calls),
+    otherwise the DynamoDB client
+    """
+    if DAX_ENDPOINT:
+        try:
+            from amazondax import AmazonDaxClient
+            return AmazonDaxClient(endpoint_url=DAX_ENDPOINT)
+        except Exception as e:
+            logger.warning("DAX unavailable, reading from DynamoDB: %s", e)
+    return ddb
+
+metadata_reader = create_metadata_reader()
+
+# Headers shared by every response; built once and never mutated
+RESPONSE_HEADERS = {
+    'Access-Control-Allow-Origin': '*',
+    'Access-Control-Allow-Headers': 'Content-Type,Authorization',
+    'Access-Control-Allow-Methods': 'OPTIONS,GET',
+    'Content-Type': 'application/json'
+}
+
+# Only the attributes generate_video_response reads; eventually consistent reads
+# cost half the RCUs of strongly consistent ones
+VIDEO_PROJECTION = '#s,title,description,thumbnailUrl,#d,videoUrls,availableQualities'
+VIDEO_ATTR_NAMES = {'#s': 'status', '#d': 'duration'}
+
+# Cognito subscription_type values (including legacy ones) -> canonical type
+SUBSCRIPTION_TYPES = {
+    'trial': 'free',
+    'saving': 'standard',
+    'guest': 'free',
+    'free': 'free',
+    'standard': 'standard',
+    'premium': 'premium'
+}
+
+# Non-premium playback: subscription -> (videoUrls key, quality, max duration in seconds)
+SUBSCRIPTION_PLAYBACK = {
+    'free': ('free', '480p', 10),
+    'standard': ('standard', '480p', None)
+}
+
+# Premium quality choice -> videoUrls key (480p uses the standard version)
+PREMIUM_URL_KEYS = {
+    '480p': 'standard',
+    '720p': 'premium_720p',
+    '1080p': 'premium_1080p'
+}
+
+# Qualities and features each subscription can see; shared by every response
+# and never mutated. Features stay plain dicts so json.dumps encodes them directly.
+SUBSCRIPTION_QUALITIES = {
+    'free': ('480p',),
+    'standard': ('480p',),
+    'premium': ('480p', '720p', '1080p')  # Premium users can see all qualities
+}
+SUBSCRIPTION_FEATURES = {
+    'free': {'maxDuration': 10},
+    'standard': {'fullAccess': True},
+    'premium': {'fullAccess': True, 'qualitySelection': True}
+}
+
+# Subscription types cached per container: username -> (subscription_type, expires_at)
+SUBSCRIPTION_CACHE_TTL_SECONDS = 300
+SUBSCRIPTION_CACHE_MAX_ENTRIES = 1024
+_subscription_cache = {}
+
+# Lifetime of video URLs handed to free and paying users
+FREE_URL_TTL_SECONDS = 15 * 60
+PAID_URL_TTL_SECONDS = 2 * 60 * 60
+
+# CloudFront URL signing (optional): key pair ID of a trusted key group and the
+# name of the SSM SecureString holding its PEM private key. Signing needs the
+# cryptography package in the deployment package or a layer; without these
+# settings URLs only carry an expiry hint.
+CLOUDFRONT_KEY_PAIR_ID = os.environ.get('CLOUDFRONT_KEY_PAIR_ID')
+CLOUDFRONT_PRIVATE_KEY_PARAMETER = os.environ.get('CLOUDFRONT_PRIVATE_KEY_PARAMETER')
+
+CANNED_POLICY = '{"Statement":[{"Resource":"%s","Condition":{"DateLessThan":{"AWS:EpochTime":%d}}}]}'
+CLOUDFRONT_BASE64_CHARS = str.maketrans('+=/', '-_~')
+_cloudfront_key = None
+
+def load_cloudfront_key():
+    """
+    Read the PEM signing key from SSM and parse it, so the secret never sits in
+    the function's environment variables
+    Only a successfully loaded key is kept; after a failure the next signing
+    attempt reads SSM again instead of the container staying unsigned for life
+    """
+    global _cloudfront_key
+    from cryptography.hazmat.primitives import serialization
+    
+    ssm = boto3.client('ssm', config=_boto_config)
+    response = ssm.get_parameter(Name=CLOUDFRONT_PRIVATE_KEY_PARAMETER, WithDecryption=True)
+    _cloudfront_key = serialization.load_pem_private_key(response['Parameter']['Value'].encode(), password=None)
+    return _cloudfront_key
+
+# Load the key during init so warm requests skip the SSM round trip
+if CLOUDFRONT_KEY_PAIR_ID and CLOUDFRONT_PRIVATE_KEY_PARAMETER:
+    try:
+        load_cloudfront_key()
+    except Exception as e:
+        logger.error("Could not load CloudFront private key, retrying on first use: %s", e)
+
+# HMAC-SHA256 keyed once (on first use) with the validation secret; each token copies it
+_validation_hmac = None
+
+# Video metadata cached per container: video_id -> (item, expires_at). Writes
+# happen in other Lambdas, so the short TTL bounds staleness.
+VIDEO_CACHE_TTL_SECONDS = 5
+VIDEO_CACHE_MAX_ENTRIES = 1024
+_video_cache = {}
+
+# Worker for the Cognito lookup that overlaps the DynamoDB read in the handler
+_lookup_pool = ThreadPoolExecutor(max_workers=1)
 
 def lambda_handler(event, context):
     """
@@ -25,7 +164,7 @@ def lambda_handler(event, context):
     Supports guest, standard, and premium subscription plans
     """
     try:
-        print(f"Received event: {json.dumps(event)}")
+        logger.debug("Received event: %s", event)
         
         # Extract user information from JWT token
         user_info = extract_user_info(event)
@@ -37,12 +176,18 @@ def lambda_handler(event, context):
         if not video_id:
             return create_error_response(400, 'Video ID is required')
         
-        # Get user subscription type
-        subscription_type = get_user_subscription(user_info['username'])
-        print(f"User {user_info['username']} has subscription type: {subscription_type}")
+        # Get user subscription type (Cognito) and video metadata (DynamoDB);
+        # the two lookups are independent, so on a subscription cache miss
+        # they run concurrently
+        subscription_type = cached_subscription(user_info['username'])
+        if subscription_type is None:
+            subscription_future = _lookup_pool.submit(get_user_subscription, user_info['username'])
+            video_metadata = get_video_metadata(video_id)
+            subscription_type = subscription_future.result()
+        else:
+            video_metadata = get_video_metadata(video_id)
+        logger.debug("User %s has subscription type: %s", user_info['username'], subscription_type)
         
-        # Get video metadata from DynamoDB
-        video_metadata = get_video_metadata(video_id)
         if not video_metadata:
             return create_error_response(404, 'Video not found')
         
@@ -52,62 +197,88 @@ def lambda_handler(event, context):
         # Generate appropriate video response based on subscription
         video_response = generate_video_response(video_id, subscription_type, user_info, video_metadata, event)
         
-        # Convert any Decimal types to float for JSON serialization
-        video_response = decimal_to_float(video_response)
-        
         return {
             'statusCode': 200,
-            'headers': {
-                'Access-Control-Allow-Origin': '*',
-                'Access-Control-Allow-Headers': 'Content-Type,Authorization',
-                'Access-Control-Allow-Methods': 'OPTIONS,GET',
-                'Content-Type': 'application/json'
-            },
-            'body': json.dumps(video_response)
+            'headers': RESPONSE_HEADERS,
+            # Compact separators skip the padding whitespace
+            'body': json.dumps(video_response, separators=(',', ':'))
         }
         
     except Exception as e:
-        print(f"Error in video streaming: {str(e)}")
+        logger.error("Error in video streaming: %s", e)
         return create_error_response(500, f'Internal server error: {str(e)}')
 
 def extract_user_info(event):
     """Extract user information from JWT token"""
     try:
-        headers = event.get('headers', {})
-        print(f"Request headers: {headers}")
+        headers = event.get('headers') or {}
+        logger.debug("Request headers: %s", headers)
         
-        auth_header = headers.get('Authorization', '') or headers.get('authorization', '')
-        if not auth_header.startswith('Bearer '):
-            print(f"Invalid authorization header: {auth_header}")
+        # Header names keep the client's casing (REST API) or are lowercased
+        # (HTTP API); one pass finds the header whatever its case
+        auth_header = next((value for name, value in headers.items() if name.lower() == 'authorization'), None) or ''
+        if auth_header[:7] != 'Bearer ':
+            logger.debug("Invalid authorization header: %s", auth_header)
             return None
         
-        token = auth_header.split(' ')[1]
-        print(f"Extracted token: {token[:50]}...")
+        token = auth_header[7:]
+        logger.debug("Extracted token: %.50s...", token)
         
         # Decode JWT token without signature verification (for development)
         # In production, you should verify the signature properly
-        decoded_token = jwt.decode(token, options={"verify_signature": False})
-        print(f"Decoded token: {decoded_token}")
+        decoded_token = decode_jwt_payload(token)
+        logger.debug("Decoded token: %s", decoded_token)
         
         user_info = {
             'username': decoded_token.get('cognito:username'),
             'email': decoded_token.get('email'),
             'sub': decoded_token.get('sub')
         }
-        print(f"Extracted user info: {user_info}")
+        logger.debug("Extracted user info: %s", user_info)
         
         return user_info
     except Exception as e:
-        print(f"Error extracting user info: {str(e)}")
+        logger.warning("Error extracting user info: %s", e)
         return None
 
+def decode_jwt_payload(token):
+    """
+    Decode the claims of a JWT without verifying its signature
+    Only the base64url payload segment is read, so no JWT library is needed
+    """
+    payload = token.split('.')[1]
+    return json.loads(base64.urlsafe_b64decode(payload + '=' * (-len(payload) % 4)))
+
+def cache_get(cache, key):
+    """Return a value from one of the per-container caches, or None if missing or expired"""
+    entry = cache.get(key)
+    if entry is not None and entry[1] > time.monotonic():
+        return entry[0]
+    return None
+
+def cache_put(cache, key, value, ttl_seconds, max_entries):
+    """Cache a value for ttl_seconds, evicting the oldest entry when full"""
+    if key not in cache and len(cache) >= max_entries:
+        cache.pop(next(iter(cache)))
+    cache[key] = (value, time.monotonic() + ttl_seconds)
+
+def cached_subscription(username):
+    """Return the cached subscription type for a user, or None if missing or expired"""
+    return cache_get(_subscription_cache, username)
+
 def get_user_subscription(username):
-    """Get user subscription type from Cognito"""
+    """
+    Get user subscription type from Cognito
+    Results are cached per container for SUBSCRIPTION_CACHE_TTL_SECONDS so warm
+    invocations skip the admin_get_user round-trip
+    """
+    subscription_type = cached_subscription(username)
+    if subscription_type is not None:
+        return subscription_type
+    
     try:
-        user_pool_id = os.environ['USER_POOL_ID']
-        
         response = cognito.admin_get_user(
-            UserPoolId=user_pool_id,
+            UserPoolId=USER_POOL_ID,
             Username=username
         )
         
@@ -118,56 +289,88 @@ def get_user_subscription(username):
                 subscription_type = attr['Value']
                 break
         
-        print(f"Found subscription_type for {username}: {subscription_type}")
+        logger.debug("Found subscription_type for %s: %s", username, subscription_type)
         
         # Map old subscription types to new ones for backward compatibility
-        if subscription_type == 'trial':
-            return 'free'
-        elif subscription_type == 'saving':
-            return 'standard'
-        elif subscription_type == 'guest':
-            return 'free'
-        elif subscription_type in ['free', 'standard', 'premium']:
-            return subscription_type
-        else:
+        canonical_type = SUBSCRIPTION_TYPES.get(subscription_type)
+        if canonical_type is None:
             # If no valid subscription type found, default to free for security
-            print(f"No valid subscription type found for {username}, defaulting to free")
-            return 'free'
+            logger.info("No valid subscription type found for %s, defaulting to free", username)
+            canonical_type = 'free'
+        subscription_type = canonical_type
+        
+        # Cache the canonical value
+        cache_put(_subscription_cache, username, subscription_type,
+                  SUBSCRIPTION_CACHE_TTL_SECONDS, SUBSCRIPTION_CACHE_MAX_ENTRIES)
         
-    except ClientError as e:
-        print(f"Error getting user subscription: {str(e)}")
-        # Default to free for security purposes
+        return subscription_type
+        
+    except (ClientError, BotoCoreError) as e:
+        # BotoCoreError covers connect/read timeouts, which the short timeouts make routine
+        logger.error("Error getting user subscription: %s", e)
+        # Default to free for security purposes (not cached, so the next request retries)
         return 'free'
 
 def get_video_metadata(video_id):
-    """Get video metadata from DynamoDB"""
-    try:
-        if not table:
-            print("DynamoDB table not configured")
-            return None
-            
-        print(f"Looking up video metadata for video_id: {video_id}")
-        response = table.get_item(
-            Key={'videoId': video_id}
-        )
-        
-        item = response.get('Item')
-        if item:
-            print(f"Found video metadata: {item}")
-        else:
-            print(f"No video found with ID: {video_id}")
-        
+    """
+    Get video metadata from DynamoDB
+    Found items are cached for VIDEO_CACHE_TTL_SECONDS so bursts of requests for
+    the same video on a warm container share one read
+    Returns None only when the video does not exist; read failures (throttling,
+    timeouts) propagate so the handler answers 500 rather than 404
+    """
+    if not table_name:
+        raise Exception("DynamoDB table not configured")
+    
+    item = cache_get(_video_cache, video_id)
+    if item is not None:
         return item
+    
+    logger.debug("Looking up video metadata for video_id: %s", video_id)
+    response = metadata_reader.get_item(
+        TableName=table_name,
+        Key={'videoId': {'S': video_id}},
+        ProjectionExpression=VIDEO_PROJECTION,
+        ExpressionAttributeNames=dict(VIDEO_ATTR_NAMES),
+        ConsistentRead=False
+    )
+    
+    item = response.get('Item')
+    if item:
+        item = {name: from_av(value) for name, value in item.items()}
+        logger.debug("Found video metadata: %s", item)
         
-    except Exception as e:
-        print(f"Error getting video metadata for {video_id}: {str(e)}")
+        cache_put(_video_cache, video_id, item, VIDEO_CACHE_TTL_SECONDS, VIDEO_CACHE_MAX_ENTRIES)
+    else:
+        logger.info("No video found with ID: %s", video_id)
+    
+    return item
+
+def from_av(value):
+    """
+    Decode a low-level DynamoDB AttributeValue into a plain Python value
+    Numbers become floats directly, never Decimal
+    """
+    (type_code, data), = value.items()
+    if type_code == 'S':
+        return data
+    if type_code == 'N':
+        return float(data)
+    if type_code == 'M':
+        return {key: from_av(item) for key, item in data.items()}
+    if type_code == 'L':
+        return [from_av(item) for item in data]
+    if type_code == 'SS':
+        return set(data)
+    if type_code == 'BOOL':
+        return data
+    if type_code == 'NULL':
         return None
+    raise TypeError(f"Unsupported DynamoDB attribute type: {type_code}")
 
 def generate_video_response(video_id, subscription_type, user_info, video_metadata, event=None):
     """Generate video response based on subscription type"""
     
-    cloudfront_domain = os.environ['CLOUDFRONT_DOMAIN']
-    
     # Get video URLs from metadata
     video_urls = video_metadata.get('videoUrls', {})
     
@@ -176,34 +379,29 @@ def generate_video_response(video_id, subscription_type, user_info, video_metada
     quality = None
     max_duration = None
     
-    print(f"Available video URLs: {video_urls}")
+    logger.debug("Available video URLs: %s", video_urls)
     
-    if subscription_type == 'free':
-        video_url = video_urls.get('free')
-        quality = '480p'
-        max_duration = 10  # 10 seconds for free users
-        print(f"Free user - using video_url: {video_url}")
-    elif subscription_type == 'standard':
-        video_url = video_urls.get('standard')
-        quality = '480p'
-        max_duration = None  # Full video
-        print(f"Standard user - using video_url: {video_url}")
-    elif subscription_type == 'premium':
+    if subscription_type == 'premium':
         # Premium users can choose quality, default to 720p
         requested_quality = '720p'
         if event and event.get('queryStringParameters'):
             requested_quality = event['queryStringParameters'].get('quality', '720p')
+        quality = requested_quality if requested_quality in PREMIUM_URL_KEYS else '720p'
+        video_url = video_urls.get(PREMIUM_URL_KEYS[quality])
         
-        if requested_quality == '1080p':
-            video_url = video_urls.get('premium_1080p')
-            quality = '1080p'
-        elif requested_quality == '480p':
-            video_url = video_urls.get('standard')  # Use standard 480p version
-            quality = '480p'
-        else:  # Default to 720p
-            video_url = video_urls.get('premium_720p')
-            quality = '720p'
+        # Renditions larger than the source are not encoded; fall back to the best lower one
+        if not video_url:
+            for url_key, fallback_quality in (('premium_720p', '720p'), ('standard', '480p')):
+                video_url = video_urls.get(url_key)
+                if video_url:
+                    quality = fallback_quality
+                    break
         max_duration = None  # Full video
+    else:
+        # Free users get the 10-second preview, standard users the full 480p video
+        url_key, quality, max_duration = SUBSCRIPTION_PLAYBACK.get(subscription_type, (None, None, None))
+        video_url = video_urls.get(url_key)
+        logger.debug("%s user - using video_url: %s", subscription_type, video_url)
     
     if not video_url:
         raise Exception(f"Video not available for subscription type: {subscription_type}")
@@ -217,92 +415,88 @@ def generate_video_response(video_id, subscription_type, user_info, video_metada
         'title': video_metadata.get('title', 'Untitled Video'),
         'description': video_metadata.get('description', ''),
         'thumbnail': video_metadata.get('thumbnailUrl', ''),
-        'duration': float(video_metadata.get('duration', 0)) if video_metadata.get('duration') else 0,
+        'duration': video_metadata.get('duration') or 0.0,  # already a float (from_av)
         'subscriptionType': subscription_type,
         'videoUrl': signed_url,
         'quality': quality,
         'maxDuration': max_duration,
-        'availableQualities': get_available_qualities(subscription_type),
+        'availableQualities': [
+            q for q in get_available_qualities(subscription_type)
+            if q in video_metadata.get('availableQualities', ['480p', '720p', '1080p'])
+        ],
         'user': user_info['username']
     }
     
     # Add subscription-specific features
-    if subscription_type == 'free':
-        response['features'] = {
-            'maxDuration': 10
-        }
-    elif subscription_type == 'standard':
-        response['features'] = {
-            'fullAccess': True
-        }
-    elif subscription_type == 'premium':
-        response['features'] = {
-            'fullAccess': True,
-            'qualitySelection': True
-        }
+    features = SUBSCRIPTION_FEATURES.get(subscription_type)
+    if features is not None:
+        response['features'] = features
     
     return response
 
 def get_available_qualities(subscription_type):
     """Get available video qualities based on subscription type"""
-    if subscription_type == 'free':
-        return ['480p']
-    elif subscription_type == 'standard':
-        return ['480p']
-    elif subscription_type == 'premium':
-        return ['480p', '720p', '1080p']  # Premium users can see all qualities
-    else:
-        return ['480p']
+    return SUBSCRIPTION_QUALITIES.get(subscription_type, ('480p',))
 
 def generate_cloudfront_signed_url(video_url, subscription_type):
     """Generate CloudFront signed URL with appropriate expiration"""
     try:
-        # Set different expiration times based on subscription
-        if subscription_type == 'free':
-            # Short expiration for free users to limit access
-            expiration_time = datetime.utcnow() + timedelta(minutes=15)
-        else:
-            # Longer expiration for paying users
-            expiration_time = datetime.utcnow() + timedelta(hours=2)
+        # Short expiration for free users to limit access, longer for paying users
+        expires = int(time.time()) + (FREE_URL_TTL_SECONDS if subscription_type == 'free' else PAID_URL_TTL_SECONDS)
+        
+        if not (CLOUDFRONT_KEY_PAIR_ID and CLOUDFRONT_PRIVATE_KEY_PARAMETER):
+            # Signing not configured: plain expiry hint only
+            return video_url + f"?expires={expires}"
         
-        # This is a simplified version - in production you'd use proper CloudFront signing
-        return video_url + f"?expires={int(expiration_time.timestamp())}"
+        # Canned-policy signed URL
+        policy = CANNED_POLICY % (video_url, expires)
+        separator = '&' if '?' in video_url else '?'
+        return (
+            f"{video_url}{separator}Expires={expires}"
+            f"&Signature={cloudfront_signature(policy.encode())}"
+            f"&Key-Pair-Id={CLOUDFRONT_KEY_PAIR_ID}"
+        )
         
     except Exception as e:
-        print(f"Error generating signed URL: {str(e)}")
+        logger.error("Error generating signed URL: %s", e)
         return video_url
 
-
-def decimal_to_float(obj):
-    """Convert Decimal objects to float for JSON serialization"""
-    if isinstance(obj, Decimal):
-        return float(obj)
-    elif isinstance(obj, dict):
-        return {key: decimal_to_float(value) for key, value in obj.items()}
-    elif isinstance(obj, list):
-        return [decimal_to_float(item) for item in obj]
-    return obj
+def cloudfront_signature(policy):
+    """
+    RSA-SHA1 sign a CloudFront policy and encode it with CloudFront's URL-safe base64
+    The key loaded from SSM is reused by warm invocations
+    """
+    from cryptography.hazmat.primitives import hashes
+    from cryptography.hazmat.primitives.asymmetric import padding
+    
+    private_key = _cloudfront_key or load_cloudfront_key()
+    signature = private_key.sign(policy, padding.PKCS1v15(), hashes.SHA1())
+    return base64.b64encode(signature).decode().translate(CLOUDFRONT_BASE64_CHARS)
 
 def generate_validation_token(username, video_id, max_duration):
     """Generate a validation token for time-limited access"""
-    secret = os.environ.get('JWT_SECRET', 'default-secret')
     timestamp = int(time.time())
     data = f"{username}:{video_id}:{max_duration}:{timestamp}"
-    token = hmac.new(secret.encode(), data.encode(), hashlib.sha256).hexdigest()
-    return f"{timestamp}:{token}"
+    global _validation_hmac
+    if _validation_hmac is None:
+        import hashlib
+        import hmac
+        _validation_hmac = hmac.new(JWT_SECRET, None, hashlib.sha256)
+    
+    # Copy the pre-keyed HMAC instead of re-deriving the inner/outer key pads
+    mac = _validation_hmac.copy()
+    mac.update(data.encode())
+    return f"{timestamp}:{mac.hexdigest()}"
 
 def create_error_response(status_code, message):
     """Create standardized error response"""
+    from datetime import datetime
+    
     return {
         'statusCode': status_code,
-        'headers': {
-            'Access-Control-Allow-Origin': '*',
-            'Access-Control-Allow-Headers': 'Content-Type,Authorization',
-            'Access-Control-Allow-Methods': 'OPTIONS,GET',
-            'Content-Type': 'application/json'
-        },
+        'headers': RESPONSE_HEADERS,
         'body': json.dumps({
             'error': message,
             'timestamp': datetime.utcnow().isoformat()
-        })
+        }, separators=(',', ':'))
     }
@@ -286,6 +286,32 @@ deploy_stack() {
     fi
 }
 
+# Function to redeploy the API stage
+# APIDeployment has a fixed logical ID, so stack updates never create a new
+# deployment; API-level settings such as MinimumCompressionSize only take
+# effect on the prod stage after an explicit redeploy
+redeploy_api_stage() {
+    local api_id=$(get_stack_output "${APP_NAME}-API" "APIGatewayId")
+    
+    if [[ -z "$api_id" || "$api_id" == "None" ]]; then
+        print_warning "API Gateway ID not found, skipping stage redeploy"
+        return
+    fi
+    
+    print_status "Redeploying API Gateway stage prod..."
+    if aws apigateway create-deployment \
+        --rest-api-id $api_id \
+        --stage-name prod \
+        --description "Redeployed by deploy.sh" \
+        --profile $AWS_PROFILE \
+        --region $AWS_REGION > /dev/null; then
+        print_success "API Gateway stage redeployed"
+    else
+        print_error "Failed to redeploy API Gateway stage"
+        exit 1
+    fi
+}
+
 # Function to get stack output value
 get_stack_output() {
     local stack_name=$1
@@ -556,6 +582,10 @@ main() {
         "API Gateway and Lambda Stack"
     echo
     
+    # Apply API-level settings changed since the stage was last deployed
+    redeploy_api_stage
+    echo
+    
     print_success "All CloudFormation stacks deployed successfully!"
     echo
     
@@ -10,6 +10,8 @@ class VideoLibrary {
         this.videosPerPage = (APP_CONFIG && APP_CONFIG.pagination && APP_CONFIG.pagination.videosPerPage) || 12;
         this.searchQuery = '';
         this.isLoading = false;
+        // Opaque cursors returned by the API, keyed by the page they start
+        this.pageCursors = { 1: null };
 
         this.initializeEventListeners();
     }
@@ -71,6 +73,11 @@ class VideoLibrary {
                 // Removed status filter to show all videos
             });
 
+            const cursor = this.pageCursors[page];
+            if (cursor) {
+                queryParams.append('cursor', cursor);
+            }
+
             if (search) {
                 queryParams.append('search', search);
             }
@@ -92,19 +99,26 @@ class VideoLibrary {
 
             // Handle API response format
             const videos = data.videos || [];
-            const totalVideos = data.pagination ? data.pagination.totalItems : 0;
+            const pagination = data.pagination || {};
+            const totalVideos = pagination.totalItems;
             console.log('Extracted videos:', videos, 'totalVideos:', totalVideos);
 
-            // Calculate pagination based on total videos
-            this.totalPages = Math.ceil(totalVideos / this.videosPerPage);
-            this.currentPage = Math.min(page, this.totalPages || 1);
+            // Remember where the next page starts so it can be requested directly
+            if (pagination.hasNext && pagination.nextCursor) {
+                this.pageCursors[page + 1] = pagination.nextCursor;
+            }
+
+            // Only pages with a known starting cursor can be navigated to
+            this.currentPage = page;
+            this.totalPages = Math.max(...Object.keys(this.pageCursors).map(Number));
 
-            // For now, show all videos (we can add pagination later if needed)
             this.renderVideoGrid(videos);
             this.renderPagination({
                 currentPage: this.currentPage,
                 totalPages: this.totalPages,
-                totalVideos: totalVideos
+                totalItems: totalVideos,
+                hasNext: !!pagination.hasNext,
+                hasPrevious: page > 1
             });
 
         } catch (error) {
@@ -195,11 +209,15 @@ class VideoLibrary {
             startPage = Math.max(1, endPage - maxButtons + 1);
         }
 
+        const pageStart = (currentPage - 1) * this.videosPerPage + 1;
+        const pageEnd = pagination.totalItems != null
+            ? Math.min(currentPage * this.videosPerPage, pagination.totalItems)
+            : currentPage * this.videosPerPage;
+        const totalLabel = pagination.totalItems != null ? ` of ${pagination.totalItems} videos` : '';
+
         let paginationHTML = `
             <div class="pagination-info">
-                Showing ${(currentPage - 1) * this.videosPerPage + 1} - 
-                ${Math.min(currentPage * this.videosPerPage, pagination.totalItems)} 
-                of ${pagination.totalItems} videos
+                Showing ${pageStart} - ${pageEnd}${totalLabel}
             </div>
             <div class="pagination-controls">
         `;
@@ -278,6 +296,7 @@ class VideoLibrary {
 
         this.searchQuery = searchInput.value.trim();
         this.currentPage = 1;
+        this.pageCursors = { 1: null };
 
         await this.loadVideos(1, this.searchQuery);
     }